@@ -0,0 +1,10 @@
+"""Hub Rental Services Analysis.
+
+Helpers for loading, cleaning and caching the hub rental usage data that the
+``hub_rental_services_analysis_.py`` report is built on.
+"""
+
+from hub_rental.cache import load_dataset, load_datasets
+from hub_rental.ingest import LOCAL_WORKBOOK, SHEET_URL, clean_frame, read_source
+
+__all__ = ["LOCAL_WORKBOOK", "SHEET_URL", "clean_frame", "load_dataset", "load_datasets", "read_source"]
@@ -0,0 +1,5 @@
+import sys
+
+from hub_rental.cli import main
+
+sys.exit(main())
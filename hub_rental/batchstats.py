@@ -0,0 +1,159 @@
+"""Batched rented vs non-rented comparisons over many segments at once.
+
+``stages.rental_ttest`` compares customers who rented an implement with those
+who did not for the whole dataset, one scipy call at a time. Here the same
+comparison is run for every segment of a dimension (every region, implement
+type, year, ...) in one vectorised pass: values are stacked into flat NumPy
+arrays with an integer segment code, per-segment moments come from
+``np.bincount`` and the test statistics are evaluated for all segments with
+single calls to the scipy distributions.
+
+The Mann-Whitney U test uses the normal approximation with tie and continuity
+corrections (scipy's ``method='asymptotic'``).
+"""
+
+import numpy as np
+import pandas as pd
+
+from hub_rental.stages import RENTED_COLUMN
+
+# Dimension name -> columns defining its segments; None is the whole dataset
+DEFAULT_DIMENSIONS = {
+    'overall': None,
+    'region': ['Region of operation'],
+    'implement': ['1st Implement'],
+    'year': ['Year'],
+}
+
+
+def _segment_codes(df, by):
+    if not by:
+        return np.zeros(len(df), dtype='int64'), pd.Index(['all'], name='segment')
+    grouper = df.groupby(by, observed=True, sort=True)
+    # ngroup numbers the segments in the order of the sorted group keys and
+    # leaves rows with a missing key unnumbered; those get code -1
+    codes = grouper.ngroup().fillna(-1).to_numpy(dtype='int64')
+    return codes, grouper.size().index
+
+
+def _moments(x, codes, size):
+    n = np.bincount(codes, minlength=size).astype('float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(codes, weights=x, minlength=size) / n
+        # Two-pass variance, stable for large acreage values
+        m2 = np.bincount(codes, weights=(x - mean[codes]) ** 2, minlength=size)
+        var = np.where(n > 1, m2 / (n - 1), np.nan)
+    return n, mean, var
+
+
+def _mann_whitney(x, codes, rented, size, n1, n2):
+    from scipy import stats
+
+    frame = pd.DataFrame({'code': codes, 'x': x})
+    ranks = frame.groupby('code')['x'].rank(method='average').to_numpy()
+    r1 = np.bincount(codes[rented], weights=ranks[rented], minlength=size)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    u2 = n1 * n2 - u1
+
+    # Tie correction: sum of t^3 - t over groups of tied values per segment
+    ties = frame.groupby(['code', 'x']).size()
+    tie_term = np.bincount(ties.index.get_level_values('code'),
+                           weights=(ties ** 3 - ties).to_numpy(dtype='float64'), minlength=size)
+
+    n = n1 + n2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mu = n1 * n2 / 2
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (np.maximum(u1, u2) - mu - 0.5) / sigma
+    p = np.clip(2 * stats.norm.sf(z), 0, 1)
+    return u1, p
+
+
+def compare_segments(df, by=None, column='Total Acres Serviced', confidence=0.95):
+    """Rented vs non-rented comparison of ``column`` for every segment of ``by``.
+
+    Returns one row per segment with the group sizes, means and standard
+    deviations, confidence intervals for both means, Student and Welch
+    t-tests, the Mann-Whitney U test and Cohen's d (with the pooled standard
+    deviation used by the report).
+    """
+    from scipy import stats
+
+    by = [by] if isinstance(by, str) else by
+    status = df[RENTED_COLUMN]
+    mask = (status.isin(['Yes', 'No']) & df[column].notna()).to_numpy()
+    codes, keys = _segment_codes(df, by)
+    size = len(keys)
+    codes = codes[mask]
+    keep = codes >= 0
+    codes = codes[keep]
+    x = df[column].to_numpy(dtype='float64')[mask][keep]
+    rented = (status.to_numpy()[mask][keep] == 'Yes')
+
+    n1, mean1, var1 = _moments(x[rented], codes[rented], size)
+    n2, mean2, var2 = _moments(x[~rented], codes[~rented], size)
+    diff = mean1 - mean2
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Student t-test (equal variances), as stats.ttest_ind
+        # A single-row group adds no squared deviations (its variance is NaN)
+        dof = n1 + n2 - 2
+        pooled_var = (np.where(n1 > 1, (n1 - 1) * var1, 0) + np.where(n2 > 1, (n2 - 1) * var2, 0)) / dof
+        t_student = diff / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+
+        # Welch t-test
+        se1, se2 = var1 / n1, var2 / n2
+        t_welch = diff / np.sqrt(se1 + se2)
+        dof_welch = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+
+        # Confidence intervals for both means, as stats.t.interval
+        q = (1 + confidence) / 2
+        half1 = stats.t.ppf(q, n1 - 1) * np.sqrt(se1)
+        half2 = stats.t.ppf(q, n2 - 1) * np.sqrt(se2)
+
+        cohens_d = diff / np.sqrt((var1 + var2) / 2)
+
+    u_stat, p_mwu = _mann_whitney(x, codes, rented, size, n1, n2)
+
+    result = pd.DataFrame({
+        'n_rented': n1.astype('int64'),
+        'n_non_rented': n2.astype('int64'),
+        'mean_rented': mean1,
+        'mean_non_rented': mean2,
+        'std_rented': np.sqrt(var1),
+        'std_non_rented': np.sqrt(var2),
+        'mean_diff': diff,
+        'ci_rented_low': mean1 - half1,
+        'ci_rented_high': mean1 + half1,
+        'ci_non_rented_low': mean2 - half2,
+        'ci_non_rented_high': mean2 + half2,
+        't_student': t_student,
+        'p_student': 2 * stats.t.sf(np.abs(t_student), dof),
+        't_welch': t_welch,
+        'dof_welch': dof_welch,
+        'p_welch': 2 * stats.t.sf(np.abs(t_welch), dof_welch),
+        'u_stat': u_stat,
+        'p_mannwhitney': p_mwu,
+        'cohens_d': cohens_d,
+    }, index=keys)
+    if by:
+        result.index.names = by
+    return result
+
+
+def batch_compare(df, dimensions=None, column='Total Acres Serviced', confidence=0.95):
+    """``compare_segments`` for several dimensions, stacked into one tidy frame.
+
+    ``dimensions`` maps a dimension name to its segment columns (see
+    ``DEFAULT_DIMENSIONS``). The result has a 'dimension' and a 'segment'
+    column followed by the statistics of ``compare_segments``.
+    """
+    frames = []
+    for name, by in (dimensions or DEFAULT_DIMENSIONS).items():
+        result = compare_segments(df, by, column=column, confidence=confidence)
+        segments = [' / '.join(map(str, key)) if isinstance(key, tuple) else str(key) for key in result.index]
+        result = result.reset_index(drop=True)
+        result.insert(0, 'segment', segments)
+        result.insert(0, 'dimension', name)
+        frames.append(result)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,187 @@
+"""Benchmark the report's stages on synthetic data of growing size.
+
+For every scale a synthetic export (see ``hub_rental.synthetic``) is written
+once to the cache directory, then loaded, cleaned, aggregated, tested,
+regressed and exported while a ``Profiler`` records each stage. Everything runs
+offline.
+
+The timings are appended to a JSON Lines results file, one record per stage
+and scale, tagged with the version of the code (``git describe`` by default).
+Each run is compared against the most recent earlier run of another version,
+so slowdowns between versions show up in the printed table.
+
+Run it with ``python -m hub_rental.benchmark --rows 10000 1000000``.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import pandas as pd
+from tabulate import tabulate
+
+from hub_rental import stages
+from hub_rental.cache import DEFAULT_CACHE_DIR
+from hub_rental.export import FORMATS, export_dataset
+from hub_rental.ingest import read_source
+from hub_rental.profiling import Profiler
+from hub_rental.synthetic import write_csv
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+
+DEFAULT_RESULTS = "benchmark_results.jsonl"
+
+BENCH_STAGES = ('load', 'clean', 'aggregate', 'breakdowns', 'stats', 'regression', 'export')
+
+
+def code_version():
+    """``git describe`` of the working tree, or 'unknown' outside a checkout."""
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return out.stdout.strip() or "unknown"
+
+
+def dataset_path(rows, seed, data_dir):
+    """Path of the synthetic CSV for ``rows`` and ``seed``, generated on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic-{rows}-{seed}.csv")
+    if not os.path.exists(path):
+        write_csv(path, rows, seed)
+    return path
+
+
+def run_scale(path, rows, selected=BENCH_STAGES, workers=None, export_format='csv'):
+    """Time the ``selected`` stages on the synthetic export at ``path``."""
+    profiler = Profiler()
+    with profiler.stage('load', rows=rows):
+        # Parsed and cleaned as the report does; the typed parse leaves the
+        # cleaning little more than the derived columns, so both are one stage
+        df = stages.clean(read_source(path))
+
+    if 'clean' in selected:
+        # The cleaning steps on an untyped parse, as for frames that do not
+        # come from read_source: schema coercion and the derived columns
+        raw = pd.read_csv(path)
+        with profiler.stage('clean', rows=rows):
+            stages.clean(raw)
+        del raw
+
+    if 'aggregate' in selected:
+        with profiler.stage('aggregate', rows=rows):
+            stages.aggregate(df)
+
+    if 'breakdowns' in selected:
+        with profiler.stage('breakdowns', rows=rows):
+            stages.breakdowns(df, workers=workers)
+
+    if 'stats' in selected:
+        with profiler.stage('stats', rows=rows):
+            stages.rental_ttest(df)
+            stages.segment_tests(df)
+            stages.rental_duration_stats(df)
+
+    if 'regression' in selected:
+        with profiler.stage('regression', rows=rows):
+            stages.implements_regression(df)
+
+    if 'export' in selected:
+        with tempfile.TemporaryDirectory() as tmp:
+            with profiler.stage('export', rows=rows):
+                export_dataset(df, os.path.join(tmp, f"updated_dataset.{export_format}"))
+
+    return profiler.records
+
+
+def read_results(path):
+    """All records of the results file, oldest first."""
+    try:
+        with open(path) as fh:
+            return [json.loads(line) for line in fh if line.strip()]
+    except OSError:
+        return []
+
+
+def append_results(path, records):
+    with open(path, 'a') as fh:
+        for record in records:
+            fh.write(json.dumps(record) + "\n")
+
+
+def baseline(history, version):
+    """(rows, stage) -> wall time of the latest earlier run of another version."""
+    previous = {}
+    for record in history:
+        if record['version'] != version:
+            previous[(record['rows'], record['stage'])] = record['wall_s']
+    return previous
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m hub_rental.benchmark",
+        description="Time the report's stages on synthetic data.",
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS),
+                        help="dataset sizes to benchmark (default: %(default)s)")
+    parser.add_argument("--stages", nargs="+", choices=BENCH_STAGES, default=list(BENCH_STAGES),
+                        help="stages to time; load and clean always run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data generator")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for the breakdowns")
+    parser.add_argument("--export-format", choices=FORMATS, default='csv', help="format timed by the export stage")
+    parser.add_argument("--data-dir", default=os.path.join(DEFAULT_CACHE_DIR, "synthetic"),
+                        help="where the generated datasets are kept between runs")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON Lines file the timings are appended to")
+    parser.add_argument("--label", default=None, help="version label of this run (default: git describe)")
+    return parser
+
+
+def _import_libraries():
+    # Import scipy up front so the first scale's timings do not include the
+    # import time
+    import scipy.stats  # noqa: F401
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    _import_libraries()
+    # Shapiro-Wilk warns about its p-value above 5000 rows on every scale
+    warnings.filterwarnings('ignore', message='scipy.stats.shapiro')
+    version = args.label or code_version()
+    previous = baseline(read_results(args.results), version)
+    timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+
+    table = []
+    for rows in args.rows:
+        path = dataset_path(rows, args.seed, args.data_dir)
+        records = run_scale(path, rows, args.stages, workers=args.workers, export_format=args.export_format)
+        for record in records:
+            record.update(version=version, timestamp=timestamp, seed=args.seed)
+            before = previous.get((rows, record['stage']))
+            table.append({
+                'rows': rows,
+                'stage': record['stage'],
+                'wall_s': record['wall_s'],
+                'cpu_s': record['cpu_s'],
+                'rss_growth_mb': record['rss_growth_mb'],
+                'vs_previous': None if not before else record['wall_s'] / before,
+            })
+        append_results(args.results, records)
+
+    print(f"### Benchmark ({version})")
+    print(tabulate(table, headers='keys', tablefmt='fancy_grid', floatfmt='.3f'))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
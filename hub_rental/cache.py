@@ -0,0 +1,234 @@
+"""Local columnar cache for the cleaned hub rental dataset.
+
+The first load of a source (the Google Sheet export, a CSV file or the bundled
+workbook) parses and cleans it as usual and stores the typed frame as an
+uncompressed Feather file named after the content hash of the source. Later
+loads memory-map that file and skip parsing altogether.
+
+Local sources are only re-hashed when their size or mtime changes, and only
+re-parsed when the hash changes; a directory of workbooks is fingerprinted by
+the names, sizes and mtimes of its files. Remote sources are fetched through
+``hub_rental.fetch``, which hashes the body while it streams in; requests are
+conditional on the ETag and Last-Modified of the cached download, so an
+unchanged sheet is read straight from the cache. When the download fails the
+most recent cached copy is used so the report still runs offline.
+``load_datasets`` fetches several remote sources concurrently and, given the
+hash of the frame a caller already holds, skips reading unchanged sources.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from hub_rental.fetch import DEFAULT_CONCURRENCY, fetch_all
+from hub_rental.ingest import CLEAN_VERSION, clean_frame, is_remote, read_source
+from hub_rental.profiling import NULL_PROFILER
+from hub_rental.schema import apply_schema
+
+DEFAULT_CACHE_DIR = os.environ.get("HUB_RENTAL_CACHE_DIR", ".hub_cache")
+MANIFEST_NAME = "manifest.json"
+
+
+def _file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(cache_dir):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _cache_file(cache_dir, digest):
+    return os.path.join(cache_dir, f"{digest[:32]}-v{CLEAN_VERSION}.feather")
+
+
+def _read_cached(path):
+    # Uncompressed Feather can be memory-mapped, so the columns are not copied
+    # into memory until pandas needs them
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def _write_cached(df, path):
+    tmp = path + ".tmp"
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def _validators(entry, refresh):
+    # Conditional request headers are only worth sending while the cached
+    # frame they vouch for still exists
+    if refresh or not entry.get("file") or not os.path.exists(entry["file"]):
+        return {}
+    return {key: entry[key] for key in ("etag", "last_modified") if entry.get(key)}
+
+
+def _local_digest(source, entry, profiler=NULL_PROFILER):
+    # Content hash of a local source and its stat (None for a directory)
+    if os.path.isdir(source):
+        # A directory of workbooks: fingerprint the files instead of hashing
+        # their contents
+        from hub_rental.workbooks import directory_hash
+
+        with profiler.stage("hash"):
+            return directory_hash(source), None
+    stat = os.stat(source)
+    unchanged = (
+        entry.get("size") == stat.st_size
+        and entry.get("mtime_ns") == stat.st_mtime_ns
+    )
+    with profiler.stage("hash"):
+        return (entry.get("hash") if unchanged else _file_hash(source)), stat
+
+
+def _combine(digests):
+    return hashlib.sha256("\n".join(digests).encode()).hexdigest()
+
+
+def load_dataset(source, cache_dir=DEFAULT_CACHE_DIR, refresh=False, timeout=30, profiler=NULL_PROFILER,
+                 fetched=None):
+    """Return the cleaned dataset for ``source``, using the local cache.
+
+    ``source`` is a URL, CSV path, Excel path or directory of workbooks.
+    ``refresh=True`` forces the source to be re-parsed even when its hash is
+    unchanged. ``fetched`` may hold the ``fetch_all`` result of a remote
+    source, which is then not requested again. The fetch, hash, parse and
+    cache steps are recorded as stages of ``profiler``.
+    """
+    source = str(source)
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _read_manifest(cache_dir)
+    entry = manifest.get(source, {})
+    data = None
+    validators = {}
+
+    if is_remote(source):
+        if fetched is None:
+            with profiler.stage("fetch"):
+                fetched = fetch_all([source], {source: _validators(entry, refresh)}, timeout=timeout)[source]
+        if fetched["status"] != "fetched":
+            # Unchanged since the cached download, or offline: use the last
+            # cached copy of this source
+            cached = entry.get("file")
+            if cached and os.path.exists(cached):
+                with profiler.stage("cache-read") as record:
+                    df = _read_cached(cached)
+                    record["rows"] = len(df)
+                return df
+            if fetched["status"] == "failed":
+                raise fetched["error"]
+            raise FileNotFoundError(f"{source!r} is unchanged but its cached copy is gone; reload with refresh")
+        stat = None
+        data = fetched["body"]
+        digest = fetched["digest"]
+        validators = {key: fetched[key] for key in ("etag", "last_modified") if fetched.get(key)}
+    else:
+        digest, stat = _local_digest(source, entry, profiler)
+
+    path = _cache_file(cache_dir, digest)
+    if not refresh and entry.get("hash") == digest and os.path.exists(path):
+        with profiler.stage("cache-read") as record:
+            df = _read_cached(path)
+            record["rows"] = len(df)
+    else:
+        with profiler.stage("parse") as record:
+            df = clean_frame(read_source(source, data))
+            record["rows"] = len(df)
+        with profiler.stage("cache-write", rows=len(df)):
+            _write_cached(df, path)
+        stale = entry.get("file")
+        shared = any(e.get("file") == stale for k, e in manifest.items() if k != source)
+        if stale and stale != path and not shared and os.path.exists(stale):
+            os.remove(stale)
+
+    if data is not None:
+        data.close()
+
+    entry = {"hash": digest, "file": path, **validators}
+    if stat is not None:
+        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    if manifest.get(source) != entry:
+        manifest[source] = entry
+        _write_manifest(cache_dir, manifest)
+    return df
+
+
+def dataset_hash(sources, cache_dir=DEFAULT_CACHE_DIR):
+    """Content hash of the dataset last loaded from ``sources``.
+
+    Combines the source digests recorded by ``load_dataset``, so it stands in
+    for a fingerprint of the loaded frame; None if a source was never loaded.
+    """
+    manifest = _read_manifest(cache_dir)
+    digests = [manifest.get(source, {}).get("hash") for source in dict.fromkeys(map(str, sources))]
+    if not all(digests):
+        return None
+    return _combine(digests)
+
+
+def _current_hash(sources, manifest, fetched, profiler):
+    # dataset_hash of what loading the sources now would give, without
+    # loading them: a remote source that was not downloaded (unchanged or
+    # offline) would be read from its cached copy
+    digests = []
+    for source in sources:
+        entry = manifest.get(source, {})
+        if source not in fetched:
+            digests.append(_local_digest(source, entry, profiler)[0])
+        elif fetched[source]["status"] == "fetched":
+            digests.append(fetched[source]["digest"])
+        else:
+            digests.append(entry.get("hash"))
+    return _combine(digests) if all(digests) else None
+
+
+def load_datasets(sources, cache_dir=DEFAULT_CACHE_DIR, refresh=False, timeout=30, profiler=NULL_PROFILER,
+                  concurrency=DEFAULT_CONCURRENCY, unchanged=None):
+    """Return the cleaned datasets of ``sources`` stacked into one frame.
+
+    The remote sources are downloaded concurrently, at most ``concurrency``
+    at a time, before any of them is parsed; every source then goes through
+    ``load_dataset`` and its cache as usual. ``unchanged`` may hold the
+    ``dataset_hash`` of the frame the caller already has: when the sources
+    still hash to it, None is returned without reading any frame.
+    """
+    sources = list(dict.fromkeys(map(str, sources)))
+    remote = [source for source in sources if is_remote(source)]
+    manifest = _read_manifest(cache_dir)
+    fetched = {}
+    if remote:
+        validators = {source: _validators(manifest.get(source, {}), refresh) for source in remote}
+        with profiler.stage("fetch"):
+            fetched = fetch_all(remote, validators, concurrency=concurrency, timeout=timeout)
+    if unchanged and not refresh and _current_hash(sources, manifest, fetched, profiler) == unchanged:
+        for result in fetched.values():
+            if result.get("body") is not None:
+                result["body"].close()
+        return None
+    frames = [load_dataset(source, cache_dir, refresh, timeout, profiler, fetched=fetched.get(source))
+              for source in sources]
+    if len(frames) == 1:
+        return frames[0]
+    # Categories differ between sources, so the stacked frame is typed again
+    return apply_schema(pd.concat(frames, ignore_index=True))
@@ -0,0 +1,241 @@
+"""Command line entry point: ``python -m hub_rental``.
+
+Loads the cleaned dataset (through the local cache) and runs the requested
+analysis stages, printing each stage's results. Charts are only drawn with
+``--plots``, which is also the only time matplotlib and seaborn are imported.
+"""
+
+import argparse
+import os
+
+from hub_rental import report, stages
+from hub_rental.cache import DEFAULT_CACHE_DIR, dataset_hash, load_datasets
+from hub_rental.export import DEFAULT_PARTITIONS, export_dataset
+from hub_rental.fetch import DEFAULT_CONCURRENCY
+from hub_rental.ingest import SHEET_URL
+from hub_rental.memo import AggregateCache
+from hub_rental.profiling import NULL_PROFILER, Profiler
+from hub_rental.sketches import DEFAULT_OUTLIERS
+
+STAGES = ('overview', 'aggregate', 'breakdowns', 'rental-ttest', 'segment-tests', 'resampling', 'rental-duration', 'rented-acres', 'regression', 'export')
+
+DEFAULT_OUTPUT = "updated_dataset.csv"
+
+
+def run(df, selected=STAGES, plots=False, output=DEFAULT_OUTPUT, workers=None, resamples=10_000, seed=0,
+        profiler=NULL_PROFILER, partition_by=DEFAULT_PARTITIONS, cache=None, sketch=False, outlier_path=None,
+        frame_hash=None):
+    """Run the ``selected`` stages on the cleaned frame and return their results.
+
+    Stage results come from ``cache`` (a fresh ``AggregateCache`` by default),
+    so they are only computed once per frame. ``frame_hash`` identifies the
+    frame in ``cache`` (see ``AggregateCache.bind``); without it the frame is
+    fingerprinted, unless the cache is the private default one. Each stage, and each chart drawn
+    with ``plots=True``, is recorded as a stage of ``profiler``. With
+    ``sketch=True`` the rental duration statistics come from quantile sketches;
+    its outliers are written to ``outlier_path`` when one is given (always in
+    sketch mode) rather than printed.
+    """
+    rows = len(df)
+    if cache is None:
+        # A cache of this run only ever holds this frame's results
+        cache, frame_hash = AggregateCache(), frame_hash or "run"
+    frame = cache.bind(df, frame_hash)
+    results = {}
+
+    def show(name, *args):
+        if not plots:
+            return
+        with profiler.stage(f"plot:{name}", rows=rows):
+            import matplotlib.pyplot as plt
+
+            from hub_rental import plots as charts
+
+            fig = getattr(charts, name)(*args)
+            plt.show()
+            plt.close(fig)
+
+    if 'overview' in selected:
+        with profiler.stage('overview', rows=rows):
+            report.print_overview(df)
+
+    if 'aggregate' in selected:
+        with profiler.stage('aggregate', rows=rows):
+            results['aggregate'] = aggregates = frame.get('aggregate')
+        show('implements_bar', aggregates['implement_performance'])
+        show('acres_by_year_line', aggregates['acres_by_year'])
+        show('acres_boxplot', df)
+        if plots:
+            # Only the heatmap needs the correlation matrix
+            show('correlation_heatmap', frame.get('correlation'))
+        report.print_aggregates(aggregates, preview=df.head())
+
+    if 'breakdowns' in selected:
+        with profiler.stage('breakdowns', rows=rows):
+            results['breakdowns'] = breakdowns = frame.get('breakdowns', workers=workers)
+        report.print_breakdowns(breakdowns)
+
+    if 'export' in selected:
+        # Export the updated dataset (CSV, compressed CSV, Arrow or partitioned Parquet)
+        with profiler.stage('export', rows=rows):
+            export_dataset(df, output, partition_by=partition_by)
+        print(f"\nThe updated dataset has been saved to '{output}'.")
+
+    if 'rental-ttest' in selected:
+        with profiler.stage('rental-ttest', rows=rows):
+            results['rental_ttest'] = ttest = frame.get('rental_ttest')
+        show('rental_pie', ttest['total_customers'], ttest['rented_customers'])
+        report.print_rental_ttest(ttest)
+
+    if 'segment-tests' in selected:
+        with profiler.stage('segment-tests', rows=rows):
+            results['segment_tests'] = segment_tests = frame.get('segment_tests')
+        report.print_segment_tests(segment_tests)
+
+    if 'resampling' in selected:
+        with profiler.stage('resampling', rows=rows):
+            results['resampling'] = resampled = frame.get(
+                'resampling', n_resamples=resamples, seed=seed, workers=workers)
+        report.print_resampling(resampled)
+
+    if 'rental-duration' in selected:
+        with profiler.stage('rental-duration', rows=rows):
+            if sketch:
+                duration = stages.rental_duration_sketch(df, outlier_path or DEFAULT_OUTLIERS, workers=workers)
+            else:
+                duration = frame.get('rental_duration')
+                if outlier_path:
+                    export_dataset(duration['outliers'], outlier_path)
+                    duration = {**duration, 'outlier_count': len(duration['outliers']), 'outlier_path': outlier_path}
+            results['rental_duration'] = duration
+        report.print_rental_duration(duration)
+        show('days_rented_hist', df, duration['median'])
+
+    if 'rented-acres' in selected:
+        with profiler.stage('rented-acres', rows=rows):
+            results['rented_acres'] = rented_acres = frame.get('rental_ttest', column='Acres  serviced')
+        show('rented_acres_hist', df)
+        show('rented_acres_boxplot', df)
+        report.print_rented_acres(df, rented_acres)
+
+    if 'regression' in selected:
+        with profiler.stage('regression', rows=rows):
+            results['regression'] = regression = frame.get('regression')
+            results['regional_regression'] = regional = frame.get('regional_regression')
+        show('regression_scatter', df)
+        report.print_regression(regression)
+        report.print_regional_regression(regional)
+
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="hub_rental", description="Hub rental services analysis report.")
+    parser.add_argument("--source", nargs="+", default=[SHEET_URL], metavar="SOURCE",
+                        help="Google Sheet CSV URL, CSV file, Excel workbook or directory of workbooks; "
+                             "several sources are stacked into one dataset (default: the hub sheet)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="remote sources downloaded at the same time (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory of the local dataset cache")
+    parser.add_argument("--refresh", action="store_true", help="re-parse the source even if it is unchanged")
+    parser.add_argument("--memo", action="store_true",
+                        help="keep stage results in the cache directory so reruns on unchanged data reuse them")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, metavar="STAGE",
+                        help=f"stages to run, any of: {', '.join(STAGES)} (default: all)")
+    parser.add_argument("--plots", action="store_true", help="draw and show the charts of each stage")
+    parser.add_argument("--render", metavar="DIR",
+                        help="render every chart headlessly into DIR, skipping charts whose inputs are unchanged")
+    parser.add_argument("--formats", nargs="+", choices=("png", "svg"), default=["png"],
+                        help="image formats written by --render (default: png)")
+    parser.add_argument("--sketch", action="store_true",
+                        help="compute the rental duration statistics from mergeable quantile sketches")
+    parser.add_argument("--outliers", metavar="FILE",
+                        help="write the rental duration outliers to FILE instead of printing them "
+                             f"(default with --sketch: {DEFAULT_OUTLIERS})")
+    parser.add_argument("--chunksize", type=int,
+                        help="stream the source in chunks of this many rows; only the aggregate stage "
+                             "is available in this mode")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fold rows not seen in earlier runs into the persisted aggregate state "
+                             "and print the aggregate and breakdown tables")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes for the breakdowns and resampling stages (default: all cores)")
+    parser.add_argument("--resamples", type=int, default=10_000,
+                        help="bootstrap and permutation resamples of the resampling stage (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the resampling stage")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="file written by the export stage; its suffix (.csv, .csv.gz, .arrow, .feather "
+                             "or .parquet) selects the format (default: %(default)s)")
+    parser.add_argument("--partition-by", nargs="*", default=list(DEFAULT_PARTITIONS), metavar="COLUMN",
+                        help="columns partitioning a .parquet export (default: 'Year' 'Region of operation')")
+    parser.add_argument("--profile", metavar="REPORT",
+                        help="record wall time, CPU time, peak RSS and rows of every stage and write them "
+                             "to REPORT (.json or .csv)")
+    parser.add_argument("--cprofile", metavar="FILE", help="also dump cProfile statistics of the run to FILE")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.chunksize and args.stages and set(args.stages) != {'aggregate'}:
+        parser.error("--chunksize only supports the aggregate stage")
+    if args.chunksize and len(args.source) > 1:
+        parser.error("--chunksize only supports a single source")
+
+    profiler = Profiler(args.cprofile) if args.profile or args.cprofile else NULL_PROFILER
+    profiler.start()
+    try:
+        _main(args, profiler)
+    finally:
+        profiler.stop()
+        if args.profile:
+            profiler.write(args.profile)
+            report.print_profile(profiler.records)
+    return 0
+
+
+def _main(args, profiler):
+    if args.chunksize:
+        from hub_rental.streaming import streaming_aggregate
+
+        with profiler.stage('aggregate') as record:
+            aggregates = streaming_aggregate(args.source[0], args.chunksize)
+            record['rows'] = aggregates['overview']['records']
+        report.print_aggregates(aggregates)
+        return
+
+    df = load_datasets(args.source, cache_dir=args.cache_dir, refresh=args.refresh, profiler=profiler,
+                       concurrency=args.concurrency)
+
+    if args.incremental:
+        from hub_rental.incremental import incremental_update
+
+        with profiler.stage('incremental', rows=len(df)) as record:
+            state, added = incremental_update(df, " ".join(args.source), args.cache_dir)
+            record['rows'] = added
+        print(f"{added} new rows folded in (latest extract: {state.last_extract.date()})")
+        report.print_aggregates(state.tables())
+        report.print_breakdowns(state.breakdowns())
+        overall, regional = state.regression()
+        report.print_regression(overall)
+        report.print_regional_regression(regional)
+        return
+
+    cache = frame_hash = None
+    if args.memo:
+        # The sources' digests identify the frame, so it is not hashed again
+        cache = AggregateCache(cache_dir=os.path.join(args.cache_dir, "memo"))
+        frame_hash = dataset_hash(args.source, args.cache_dir)
+    results = run(df, args.stages or STAGES, plots=args.plots, output=args.output, workers=args.workers,
+                  resamples=args.resamples, seed=args.seed, profiler=profiler, partition_by=args.partition_by,
+                  cache=cache, sketch=args.sketch, outlier_path=args.outliers, frame_hash=frame_hash)
+
+    if args.render:
+        from hub_rental.render import render_all
+
+        with profiler.stage('render', rows=len(df)):
+            status = render_all(df, args.render, formats=args.formats, workers=args.workers,
+                                aggregates=results.get('aggregate'), duration=results.get('rental_duration'))
+        rendered = sum(state == 'rendered' for state in status.values())
+        print(f"\nRendered {rendered} of {len(status)} charts into '{args.render}'.")
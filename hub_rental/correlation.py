@@ -0,0 +1,175 @@
+"""Correlation and least-squares fits from running sufficient statistics.
+
+``CrossProducts`` keeps, per segment and for every pair of columns (i, j),
+the number of rows where both are present, the sums and sums of squares of
+column i over those rows and the sum of the products. Pearson correlations
+with pandas' pairwise-complete semantics and the OLS slope, intercept and R²
+of any pair follow from these sums without touching the rows again, so the
+statistics can be updated as new rows arrive and need neither scikit-learn
+nor copies of the data.
+
+One ``update`` handles every segment at once: with a single segment the sums
+are matrix products of the value and presence matrices, otherwise one
+``np.bincount`` per column pair. Values are shifted by a per-column reference
+(the first value seen) before they are accumulated, which keeps the
+sum-of-squares formulas accurate for columns such as 'ID' or 'Year' whose
+mean dwarfs their spread.
+
+Rank correlations need the ranks of all rows, so ``spearman`` ranks the
+frame and feeds the ranks through the same engine rather than updating
+incrementally.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Predictor and response of the report's regression
+X_COLUMN = 'No. of implements owned'
+Y_COLUMN = 'Total Acres Serviced'
+
+
+def _codes(df, by, index):
+    # Integer segment code of every row, adding keys not seen before to
+    # ``index`` (key -> code); rows with a missing key get -1
+    if not by:
+        index.setdefault('all', 0)
+        return np.zeros(len(df), dtype='int64')
+    grouper = df.groupby(by, observed=True, sort=True)
+    # ngroup numbers the groups in the order of the sorted keys
+    local = grouper.ngroup().fillna(-1).to_numpy(dtype='int64')
+    mapping = np.array([index.setdefault(key, len(index)) for key in grouper.size().index], dtype='int64')
+    if not len(mapping):
+        return local
+    return np.where(local >= 0, mapping[np.maximum(local, 0)], -1)
+
+
+class CrossProducts:
+    """Pairwise sufficient statistics of ``columns`` for every segment of ``by``."""
+
+    def __init__(self, columns, by=None):
+        self.columns = list(columns)
+        self.by = [by] if isinstance(by, str) else list(by or [])
+        self.shift = None
+        self.index = {}
+        size = len(self.columns)
+        # Arrays of shape (segments, columns, columns); entry [g, i, j] sums
+        # over the rows of segment g where columns i and j are both present
+        self.n = np.zeros((0, size, size))
+        self.sx = np.zeros((0, size, size))
+        self.sxx = np.zeros((0, size, size))
+        self.sxy = np.zeros((0, size, size))
+
+    @property
+    def segments(self):
+        """Segment keys, in the order of the first axis of the sums."""
+        keys = sorted(self.index, key=self.index.get)
+        if len(self.by) > 1:
+            return pd.MultiIndex.from_tuples(keys, names=self.by)
+        return pd.Index(keys, name=self.by[0] if self.by else 'segment')
+
+    def update(self, df):
+        """Add the rows of ``df`` to the statistics; returns self."""
+        values = np.column_stack([df[col].to_numpy(dtype='float64', na_value=np.nan) for col in self.columns])
+        present = ~np.isnan(values)
+        if self.shift is None:
+            first = np.where(present.any(axis=0), present.argmax(axis=0), 0)
+            self.shift = np.nan_to_num(values[first, np.arange(len(self.columns))])
+        values = np.where(present, values - self.shift, 0.0)
+        weights = present.astype('float64')
+
+        codes = _codes(df, self.by, self.index)
+        size = len(self.index)
+        self._grow(size)
+        keep = codes >= 0
+        if size == 1:
+            values, weights = values[keep], weights[keep]
+            self.n[0] += weights.T @ weights
+            self.sx[0] += values.T @ weights
+            self.sxx[0] += (values ** 2).T @ weights
+            self.sxy[0] += values.T @ values
+            return self
+
+        codes, values, weights = codes[keep], values[keep], weights[keep]
+        for i in range(len(self.columns)):
+            for j in range(len(self.columns)):
+                both = weights[:, i] * weights[:, j]
+                self.n[:, i, j] += np.bincount(codes, weights=both, minlength=size)
+                self.sx[:, i, j] += np.bincount(codes, weights=values[:, i] * both, minlength=size)
+                self.sxx[:, i, j] += np.bincount(codes, weights=values[:, i] ** 2 * both, minlength=size)
+                self.sxy[:, i, j] += np.bincount(codes, weights=values[:, i] * values[:, j], minlength=size)
+        return self
+
+    def _grow(self, size):
+        extra = size - len(self.n)
+        if extra > 0:
+            pad = np.zeros((extra,) + self.n.shape[1:])
+            self.n, self.sx, self.sxx, self.sxy = (np.concatenate([a, pad]) for a in
+                                                   (self.n, self.sx, self.sxx, self.sxy))
+
+    def _pair(self, x, y):
+        i, j = self.columns.index(x), self.columns.index(y)
+        n = self.n[:, i, j]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x, mean_y = self.sx[:, i, j] / n, self.sx[:, j, i] / n
+            sxx = self.sxx[:, i, j] - n * mean_x ** 2
+            syy = self.sxx[:, j, i] - n * mean_y ** 2
+            sxy = self.sxy[:, i, j] - n * mean_x * mean_y
+        return n, mean_x + self.shift[i], mean_y + self.shift[j], sxx, syy, sxy
+
+    def corr(self, segment=None):
+        """Pearson correlation matrix of one segment (the first by default)."""
+        g = 0 if segment is None else self.index[segment]
+        n = self.n[g]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.sx[g] / n
+            var = np.clip(self.sxx[g] / n - mean ** 2, 0, None)
+            cov = self.sxy[g] / n - mean * mean.T
+            corr = cov / np.sqrt(var * var.T)
+        corr[n < 2] = np.nan
+        # A column correlates perfectly with itself, unless it is constant
+        np.fill_diagonal(corr, np.where((np.diag(n) > 1) & (np.diag(var) > 0), 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    def ols(self, x=X_COLUMN, y=Y_COLUMN):
+        """Least-squares fit of ``y`` on ``x`` for every segment.
+
+        Returns one row per segment with the number of complete pairs, the
+        Pearson correlation, slope, intercept and R².
+        """
+        n, mean_x, mean_y, sxx, syy, sxy = self._pair(x, y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = sxy / sxx
+            pearson = np.clip(sxy / np.sqrt(sxx * syy), -1, 1)
+        return pd.DataFrame({
+            'n': n.astype('int64'),
+            'pearson': pearson,
+            'slope': slope,
+            'intercept': mean_y - slope * mean_x,
+            'r_squared': pearson ** 2,
+        }, index=self.segments)
+
+
+def spearman(df, x=X_COLUMN, y=Y_COLUMN, by=None):
+    """Spearman rank correlation of ``x`` and ``y`` for every segment of ``by``.
+
+    Ranks are taken over the rows where both are present, with ties
+    averaged, as ``Series.corr(method='spearman')`` does.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    complete = df[by + [x, y]].dropna(subset=[x, y])
+    keys = [complete[col] for col in by]
+    ranks = complete[[x, y]].groupby(keys, observed=True).rank() if by else complete[[x, y]].rank()
+    ranks[by] = complete[by]
+    return CrossProducts([x, y], by).update(ranks).ols(x, y)['pearson'].rename('spearman')
+
+
+# Numeric columns left out of the correlation matrix. The report selected the
+# float64 and int64 columns, which never included the int32 'Year' taken from
+# 'Entry Date'; the schema's narrower integer types stand in for the others.
+CORRELATION_EXCLUDED = ('Year',)
+
+
+def correlation_matrix(df):
+    """Pearson correlations of the numeric columns, as ``numeric_data.corr()``."""
+    columns = df.select_dtypes(include='number').columns.drop(list(CORRELATION_EXCLUDED), errors='ignore')
+    return CrossProducts(columns).update(df).corr()
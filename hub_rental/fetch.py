@@ -0,0 +1,164 @@
+"""Concurrent download of remote sheet exports.
+
+``fetch_all`` downloads many URLs at once on an asyncio event loop, with at
+most ``concurrency`` requests in flight. Each request is conditional when the
+previous download's ETag or Last-Modified value is known, so a sheet that has
+not changed costs a 304 response instead of a full export. Connection errors,
+timeouts, responses cut off before their end and 429/5xx responses are
+retried with exponential backoff and jitter; other errors fail at once. A
+failure is reported in the URL's result and never stops the other downloads.
+
+Bodies are streamed in blocks into a spooled temporary file (kept in memory
+up to ``SPOOL_MAX_SIZE``) while their SHA-256 is computed, so the parser reads
+the file directly and the content hash used by the dataset cache needs no
+second pass over the bytes.
+
+``fetch_all`` can be called with or without a running event loop;
+``fetch_all_async`` awaits the downloads on the caller's loop instead.
+
+The blocking requests run on worker threads through ``urllib``, so no HTTP
+library beyond the standard library is needed. The URL is all that ties the
+fetcher to Google Sheets, so any local HTTP server can stand in for it.
+"""
+
+import asyncio
+import concurrent.futures
+import email.utils
+import hashlib
+import http.client
+import random
+import tempfile
+import urllib.error
+import urllib.request
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+BLOCK_SIZE = 1 << 16
+SPOOL_MAX_SIZE = 64 << 20
+
+# Status codes worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _request(url, validators, timeout):
+    # Runs on a worker thread
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as error:
+        if error.code == 304:
+            error.close()
+            return {'url': url, 'status': 'not-modified', **validators}
+        raise
+
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with response:
+            for block in iter(lambda: response.read(BLOCK_SIZE), b''):
+                size += len(block)
+                digest.update(block)
+                body.write(block)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            expected = response.headers.get('Content-Length')
+        # A connection closed early ends the body without an error; a
+        # truncated sheet must not be cached under the server's ETag
+        if expected and expected.isdigit() and size != int(expected):
+            raise http.client.IncompleteRead(b'', int(expected) - size)
+    except BaseException:
+        body.close()
+        raise
+    body.seek(0)
+    return {
+        'url': url,
+        'status': 'fetched',
+        'body': body,
+        'digest': digest.hexdigest(),
+        'etag': etag,
+        'last_modified': last_modified,
+    }
+
+
+def _retryable(error):
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRY_STATUSES
+    # Connection errors, timeouts and broken responses (IncompleteRead,
+    # RemoteDisconnected, ...)
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+def _retry_after(error):
+    # Seconds asked for by a Retry-After header, if any
+    value = error.headers.get('Retry-After') if isinstance(error, urllib.error.HTTPError) else None
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - email.utils.localtime().timestamp())
+
+
+async def _fetch_one(url, validators, semaphore, timeout, retries, backoff):
+    for attempt in range(retries + 1):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(_request, url, validators, timeout)
+            except Exception as error:
+                # Any error left after the retries fails this URL only
+                if attempt == retries or not _retryable(error):
+                    return {'url': url, 'status': 'failed', 'error': error}
+                delay = _retry_after(error)
+        if delay is None:
+            delay = backoff * 2 ** attempt * (1 + random.random())
+        # Wait outside the semaphore so other downloads can use the slot
+        await asyncio.sleep(delay)
+
+
+async def _fetch_all(urls, validators, concurrency, timeout, retries, backoff):
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [_fetch_one(url, validators.get(url, {}), semaphore, timeout, retries, backoff) for url in urls]
+    return await asyncio.gather(*tasks)
+
+
+async def fetch_all_async(urls, validators=None, concurrency=DEFAULT_CONCURRENCY, timeout=30,
+                          retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """``fetch_all`` as a coroutine, for callers already running an event loop."""
+    urls = list(dict.fromkeys(urls))
+    results = await _fetch_all(urls, validators or {}, concurrency, timeout, retries, backoff)
+    return dict(zip(urls, results))
+
+
+def fetch_all(urls, validators=None, concurrency=DEFAULT_CONCURRENCY, timeout=30,
+              retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Download ``urls`` concurrently; returns a dict mapping each URL to its result.
+
+    ``validators`` maps a URL to the 'etag' and 'last_modified' values of its
+    previous download, which make the request conditional. Each result is a
+    dict whose 'status' is 'fetched' (with the 'body' file, its 'digest' and
+    the new validators), 'not-modified' or 'failed' (with the 'error').
+
+    Blocks until every download is done, also when called while an event
+    loop is running (a Jupyter or Colab cell), where the downloads get an
+    event loop of their own on a worker thread.
+    """
+    def download():
+        return asyncio.run(fetch_all_async(urls, validators, concurrency, timeout, retries, backoff))
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return download()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(download).result()
@@ -0,0 +1,202 @@
+"""Incremental aggregate state for append-only extracts.
+
+Each extract repeats the previous one with new rows appended. Instead of
+recomputing every table, the aggregate state (a ``PartialAggregate`` of the
+whole dataset, sum, count and sum of squares per group, and the implements vs
+acres cross products overall and per region) is persisted next to the dataset
+cache, together with the sorted hashes of the ('ID', 'Entry Date') keys already
+counted. A new extract only contributes the rows whose key has not been seen:
+when the extract starts with exactly the rows of the last one (checked with
+a digest of their keys in row order), only the appended rows are looked up in
+the sorted hashes, otherwise every row is, with a binary search either way.
+The new keys are inserted in place, so nothing is re-sorted. An extract with
+the same number of rows and the same latest 'Entry Date' as the last one is
+taken as unchanged without hashing it at all.
+"""
+
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from hub_rental.correlation import X_COLUMN, Y_COLUMN, CrossProducts
+from hub_rental.ingest import CLEAN_VERSION
+from hub_rental.parallel import BREAKDOWNS
+from hub_rental.streaming import PartialAggregate
+
+KEY_COLUMNS = ['ID', 'Entry Date']
+
+VALUE_COLUMN = 'Total Acres Serviced'
+
+
+def row_keys(df):
+    """64-bit hashes of the ('ID', 'Entry Date') key of every row."""
+    return pd.util.hash_pandas_object(df[KEY_COLUMNS], index=False).to_numpy()
+
+
+def _digest(keys):
+    return hashlib.sha256(keys.tobytes()).hexdigest()
+
+
+def _contains(haystack, needles):
+    # Membership of every needle in the sorted ``haystack``
+    at = np.searchsorted(haystack, needles)
+    found = at < len(haystack)
+    found[found] = haystack[at[found]] == needles[found]
+    return found
+
+
+def _group_moments(df, by):
+    values = df[VALUE_COLUMN]
+    grouped = pd.DataFrame({'sum': values, 'count': values.notna().astype('int64'), 'sumsq': values ** 2})
+    return grouped.groupby([df[col] for col in by], observed=True).sum()
+
+
+class IncrementalAggregate:
+    """Aggregate tables kept up to date one extract at a time."""
+
+    def __init__(self):
+        self.version = CLEAN_VERSION
+        self.seen = np.empty(0, dtype='uint64')
+        self.totals = PartialAggregate()
+        self.groups = {name: None for name in BREAKDOWNS}
+        self.last_extract = pd.NaT
+        # Size, latest entry and key digest of the last extract, to skip
+        # unchanged extracts and the already counted rows of appended ones
+        self.extract_rows = 0
+        self.latest_entry = pd.NaT
+        self.extract_digest = _digest(self.seen)
+        self.cross = {by: CrossProducts([X_COLUMN, Y_COLUMN], by=by) for by in (None, 'Region of operation')}
+
+    def unchanged(self, df):
+        """Whether ``df`` has the size and latest entry of the last extract.
+
+        Extracts only ever grow, so such an extract holds no new rows.
+        """
+        return len(df) == self.extract_rows and df['Entry Date'].max() == self.latest_entry
+
+    def _fresh(self, keys):
+        # Positions of the keys not in the sorted ``seen`` hashes, keeping
+        # only the first row of keys repeated within ``keys``. Binary searches
+        # of sorted needles walk ``seen`` in order, several times faster than
+        # searching for the keys in row order.
+        ordered = np.sort(keys)
+        new = np.unique(ordered[~_contains(self.seen, ordered)])
+        if not len(new):
+            return np.empty(0, dtype='int64')
+        # The new keys are few, so finding their rows searches a small array
+        rows = np.flatnonzero(_contains(new, keys))
+        _, first = np.unique(keys[rows], return_index=True)
+        return np.sort(rows[first])
+
+    def new_rows(self, df):
+        """Rows of ``df`` whose key is not part of the state yet."""
+        return df.iloc[self._fresh(row_keys(df))]
+
+    def update(self, df):
+        """Fold the unseen rows of extract ``df`` into the state.
+
+        Returns the number of rows added.
+        """
+        if self.unchanged(df):
+            return 0
+        keys = row_keys(df)
+        start = self.extract_rows
+        if len(df) > start and _digest(keys[:start]) == self.extract_digest:
+            # The last extract with rows appended: look at the new rows only
+            fresh = start + self._fresh(keys[start:])
+        else:
+            fresh = self._fresh(keys)
+        self.extract_rows = len(df)
+        self.latest_entry = df['Entry Date'].max()
+        self.extract_digest = _digest(keys)
+        if not len(fresh):
+            return 0
+
+        delta = df.iloc[fresh]
+        added = np.sort(keys[fresh])
+        self.seen = np.insert(self.seen, np.searchsorted(self.seen, added), added)
+        self.totals.merge(PartialAggregate.from_chunk(delta))
+        for name, (by, _) in BREAKDOWNS.items():
+            part = _group_moments(delta, by)
+            current = self.groups[name]
+            self.groups[name] = part if current is None else current.add(part, fill_value=0)
+        for cross in self.cross.values():
+            cross.update(delta)
+        self.last_extract = pd.Series([self.last_extract, delta['Date of Extract'].max()]).max()
+        return len(delta)
+
+    def tables(self):
+        """The aggregate results, in the layout of ``stages.aggregate``."""
+        return self.totals.tables()
+
+    def group_stats(self, name):
+        """Count, sum, mean and standard deviation per group of breakdown ``name``."""
+        moments = self.groups[name]
+        count = moments['count']
+        mean = moments['sum'] / count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (moments['sumsq'] - count * mean ** 2) / (count - 1)
+        return pd.DataFrame({'count': count, 'sum': moments['sum'], 'mean': mean,
+                             'std': np.sqrt(var.clip(lower=0)).where(count > 1)})
+
+    def regression(self):
+        """Implements vs total acres fit overall and per region.
+
+        Returns the overall fit as a Series and the regional fits as a frame,
+        in the layout of ``CrossProducts.ols``.
+        """
+        overall = self.cross[None].ols().iloc[0]
+        return overall, self.cross['Region of operation'].ols().sort_index()
+
+    def breakdowns(self):
+        """The group-by breakdowns, in the layout of ``parallel.breakdowns``."""
+        results = {}
+        for name, (_, how) in BREAKDOWNS.items():
+            stats = self.group_stats(name).sort_index()
+            results[name] = stats[how].rename(VALUE_COLUMN)
+        return results
+
+
+def state_path(source, cache_dir):
+    digest = hashlib.sha256(str(source).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"incremental-{digest}.pkl")
+
+
+def load_state(source, cache_dir):
+    """The persisted state for ``source``, or a fresh one."""
+    try:
+        with open(state_path(source, cache_dir), 'rb') as fh:
+            state = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return IncrementalAggregate()
+    if getattr(state, 'version', None) != CLEAN_VERSION or not hasattr(state, 'extract_digest'):
+        # Row keys hash differently when the schema changes, and states
+        # saved before the regression or the extract size were tracked lack
+        # them; start over
+        return IncrementalAggregate()
+    return state
+
+
+def save_state(state, source, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = state_path(source, cache_dir)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fh:
+        pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def incremental_update(df, source, cache_dir):
+    """Update the persisted state of ``source`` with extract ``df``.
+
+    Returns the state and the number of new rows it absorbed.
+    """
+    state = load_state(source, cache_dir)
+    extract = state.extract_digest
+    added = state.update(df)
+    if added or state.extract_digest != extract:
+        save_state(state, source, cache_dir)
+    return state, added
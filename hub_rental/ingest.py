@@ -0,0 +1,144 @@
+"""Reading and cleaning the raw hub rental export.
+
+The raw data comes from the Google Sheet CSV export, the bundled Excel
+workbook or a directory of such workbooks. Each is parsed into a pandas
+DataFrame and then typed in a single pass according to the declared schema in
+``hub_rental.schema``, then the derived columns ('Total Acres Serviced',
+'Year') are added.
+"""
+
+import io
+import os
+
+import pandas as pd
+
+from hub_rental.fetch import fetch_all
+
+from hub_rental.schema import (
+    DATE_FORMATS,
+    DTYPES,
+    YEARLY_ACRES_COLUMNS,
+    apply_schema,
+    reconcile_column,
+)
+
+# Direct link to access the Google Sheet in CSV format
+SHEET_URL = "https://docs.google.com/spreadsheets/d/1aoM7R_UQtf7TFTbtzV48U1AmoFyOYJWx/export?format=csv"
+
+# Workbook shipped with the repository, usable as an offline source
+LOCAL_WORKBOOK = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "Implement Usage and hub rental Data -2024.xlsx",
+)
+
+# Bump whenever clean_frame or the schema changes so cached frames are rebuilt
+CLEAN_VERSION = 2
+
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm', '.xls')
+
+
+def is_remote(source):
+    """Return True when ``source`` is a URL rather than a local path."""
+    return str(source).startswith(('http://', 'https://'))
+
+
+def is_excel(source):
+    """Return True when ``source`` names an Excel workbook."""
+    return str(source).lower().endswith(EXCEL_SUFFIXES)
+
+
+def source_opener(source, data=None):
+    """Return a callable giving a fresh readable buffer for ``source`` each call.
+
+    Remote sources are downloaded once with ``hub_rental.fetch`` (so with its
+    timeout and retries, into a spooled file rather than memory), unless their
+    content is passed in as ``data`` already: bytes, or a seekable binary file
+    such as that spooled body, which is rewound for each read.
+    """
+    source = str(source)
+    if data is None and is_remote(source):
+        fetched = fetch_all([source])[source]
+        if fetched['status'] == 'failed':
+            raise fetched['error']
+        data = fetched['body']
+
+    def open_buffer():
+        if data is None:
+            return source
+        if isinstance(data, bytes):
+            return io.BytesIO(data)
+        data.seek(0)
+        return data
+
+    return open_buffer
+
+
+def source_columns(open_buffer, excel):
+    """Cleaned column names of a source, read from its header only."""
+    reader = pd.read_excel if excel else pd.read_csv
+    return [reconcile_column(col) for col in reader(open_buffer(), nrows=0).columns]
+
+
+def reader_kwargs(names, parse_dates=True, typed=True):
+    """Keyword arguments that make a pandas reader apply the schema.
+
+    The columns are renamed to their cleaned names in the same pass so the
+    schema can refer to them. With ``typed=False`` only the categorical and
+    date columns are typed, for sources whose numeric cells do not all parse.
+    """
+    dtype = {col: DTYPES[col] for col in names if col in DTYPES}
+    if not typed:
+        dtype = {col: t for col, t in dtype.items() if t == 'category'}
+    kwargs = {'header': 0, 'names': names, 'dtype': dtype}
+    if parse_dates:
+        dates = [col for col in names if col in DATE_FORMATS]
+        kwargs.update(parse_dates=dates, date_format={col: DATE_FORMATS[col] for col in dates})
+    return kwargs
+
+
+def read_source(source, data=None):
+    """Parse ``source`` into a DataFrame typed according to the schema.
+
+    ``data`` may hold the already-fetched content of the source, in which case
+    nothing is read from disk or the network again. A directory is read as
+    the stack of all its workbooks (see ``hub_rental.workbooks``); that frame
+    is typed by ``clean_frame``.
+    """
+    if data is None and os.path.isdir(str(source)):
+        from hub_rental.workbooks import read_workbooks
+
+        return read_workbooks(source)
+    open_buffer = source_opener(source, data)
+    # Excel cells already carry their date type, only CSV dates need parsing
+    excel = is_excel(source)
+    reader = pd.read_excel if excel else pd.read_csv
+    names = source_columns(open_buffer, excel)
+    try:
+        return reader(open_buffer(), **reader_kwargs(names, parse_dates=not excel))
+    except (TypeError, ValueError):
+        # Some cell does not parse as its declared type; let apply_schema
+        # coerce the numeric columns instead
+        return reader(open_buffer(), **reader_kwargs(names, parse_dates=not excel, typed=False))
+
+
+def clean_frame(df):
+    """Apply the report's cleaning steps to a frame and return it.
+
+    Frames from ``read_source`` are already typed, so this only fills in the
+    derived columns; other frames are first brought in line with the schema.
+    """
+    df.columns = [reconcile_column(col) for col in df.columns]
+    df = apply_schema(df)
+
+    # Fill missing implement values
+    second = df['2nd Implement']
+    if isinstance(second.dtype, pd.CategoricalDtype) and 'None' not in second.cat.categories:
+        second = second.cat.add_categories('None')
+    df['2nd Implement'] = second.fillna('None')
+
+    # Calculate total acres serviced across all years
+    df['Total Acres Serviced'] = df[YEARLY_ACRES_COLUMNS].sum(axis=1)
+
+    # Add a 'Year' column from the 'Entry Date'
+    df['Year'] = df['Entry Date'].dt.year
+    return df
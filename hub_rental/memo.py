@@ -0,0 +1,237 @@
+"""Memoized named aggregates.
+
+The report derives the same tables (the summary statistics, missing data,
+acres by year, performance by implements, ...) from the same frame in several
+places, and a notebook re-runs its sections against an unchanged dataset over
+and over. ``AggregateCache`` computes each named aggregate on demand and keeps
+the result under a fingerprint of the frame's content and the aggregate's
+parameters. Entries live in a bounded LRU in memory and, when a directory is
+given, are also pickled to disk so a later process gets them without
+recomputing.
+
+Fingerprinting hashes every value of the frame, so ``bind`` a frame once and
+ask the bound ``CachedFrame`` for all its aggregates; when the frame's data
+already has a content hash, such as the dataset cache's source digest, pass
+it to ``bind`` and the frame is not hashed at all. Cached results are
+shared between callers and must be treated as read-only.
+
+A cache may be shared between threads. Its lock only covers the LRU
+bookkeeping, so hits never wait for an aggregate being computed; a miss holds
+a lock of its own key while computing, so concurrent misses of one aggregate
+compute it once.
+"""
+
+import collections
+import hashlib
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+from hub_rental import stages
+from hub_rental.correlation import correlation_matrix
+from hub_rental.ingest import CLEAN_VERSION
+
+# Bump when an aggregate's code changes so persisted results are recomputed
+MEMO_VERSION = 1
+
+DEFAULT_MAXSIZE = 64
+
+# Files kept in the on-disk cache; the least recently used are removed first
+DEFAULT_MAX_FILES = 256
+
+# Parameters that change how an aggregate is computed but not its result
+UNKEYED_PARAMS = frozenset({'workers'})
+
+# Aggregate name -> function of the frame (and keyword parameters)
+AGGREGATES = {
+    'summary': stages.summary,
+    'missing_data': stages.missing_data,
+    'acres_by_year': stages.acres_by_year,
+    'implement_performance': stages.implement_performance,
+    'overview': stages.overview,
+    'breakdowns': stages.breakdowns,
+    'rental_ttest': stages.rental_ttest,
+    'segment_tests': stages.segment_tests,
+    'resampling': stages.resampling,
+    'rental_duration': stages.rental_duration_stats,
+    'regression': stages.implements_regression,
+    'regional_regression': stages.regional_regression,
+    'correlation': correlation_matrix,
+}
+
+# Aggregates assembled from other cached aggregates, in the layout of
+# ``stages.aggregate``
+COMPOSITES = {
+    'aggregate': ['overview', 'summary', 'missing_data', 'acres_by_year', 'implement_performance'],
+}
+
+
+def fingerprint(df):
+    """Content hash of a frame: its values, index, column names and dtypes."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    return digest.hexdigest()
+
+
+def aggregate_key(name, frame_hash, params):
+    """Cache key of aggregate ``name`` with ``params`` on the frame ``frame_hash``."""
+    keyed = sorted((k, v) for k, v in params.items() if k not in UNKEYED_PARAMS)
+    text = repr((MEMO_VERSION, CLEAN_VERSION, name, frame_hash, keyed))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class AggregateCache:
+    """Bounded LRU of named aggregates, optionally persisted to ``cache_dir``."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, cache_dir=None, max_files=DEFAULT_MAX_FILES):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        # Guards the entries and counters; held only for bookkeeping
+        self._lock = threading.Lock()
+        # Key -> lock held while that aggregate is computed
+        self._computing = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def bind(self, df, frame_hash=None):
+        """A ``CachedFrame`` answering aggregate queries on ``df``.
+
+        ``frame_hash`` identifies the frame's content in place of its
+        fingerprint.
+        """
+        return CachedFrame(self, df, frame_hash)
+
+    def get(self, name, df, frame_hash=None, **params):
+        """Aggregate ``name`` of ``df``, computed only if not cached yet.
+
+        ``df`` may also be a function returning the frame, which is then only
+        called when the aggregate has to be computed (or the frame
+        fingerprinted, without ``frame_hash``).
+        """
+        frame_hash = frame_hash or fingerprint(_frame(df))
+        if name in COMPOSITES:
+            return {part: self.get(part, df, frame_hash=frame_hash) for part in COMPOSITES[name]}
+        key = aggregate_key(name, frame_hash, params)
+        found, value = self._lookup(key)
+        if found:
+            return value
+
+        with self._lock:
+            computing = self._computing.setdefault(key, threading.Lock())
+        with computing:
+            # Another thread may have computed it while this one waited
+            found, value = self._lookup(key)
+            if found:
+                return value
+            try:
+                value = self._load(key)
+                computed = value is None
+                if computed:
+                    value = AGGREGATES[name](_frame(df), **params)
+                    self._store(key, value)
+                with self._lock:
+                    if computed:
+                        self.misses += 1
+                    else:
+                        self.hits += 1
+                    self._entries[key] = value
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._computing.pop(key, None)
+        return value
+
+    def clear(self):
+        """Drop every in-memory entry; persisted files are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key):
+        # (True, value) for an in-memory entry, else (False, None)
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key[:32]}.pkl")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                value = pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        # Mark the file as recently used for _prune
+        os.utime(path)
+        return value
+
+    def _store(self, key, value):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, 'wb') as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self):
+        files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith('.pkl')]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=_mtime)
+        for path in files[:len(files) - self.max_files]:
+            # Another thread or process may have pruned it already
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _frame(df):
+    return df() if callable(df) else df
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
+
+
+class CachedFrame:
+    """A frame bound to an ``AggregateCache``; its fingerprint is computed once."""
+
+    def __init__(self, cache, df, frame_hash=None):
+        self.cache = cache
+        self.df = df
+        self.frame_hash = frame_hash or fingerprint(df)
+
+    def get(self, name, **params):
+        """Aggregate ``name`` of the bound frame."""
+        return self.cache.get(name, self.df, frame_hash=self.frame_hash, **params)
+
+
+# Process-wide cache, for notebooks re-running sections on the same frame
+default_cache = AggregateCache()
+
+
+def cached(name, df, **params):
+    """Aggregate ``name`` of ``df`` from the process-wide cache."""
+    return default_cache.get(name, df, **params)
@@ -0,0 +1,143 @@
+"""Charts for the hub rental report.
+
+matplotlib and seaborn are imported inside the plotting functions so that
+loading the package (and running the non-plotting stages) stays cheap. Every
+function draws one figure and returns it; callers decide whether to show it.
+"""
+
+from hub_rental.schema import YEARLY_ACRES_COLUMNS
+
+
+def implements_bar(implement_performance):
+    """Performance by number of implements owned."""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(8, 5))
+    implement_performance.plot(kind='bar', color='skyblue', edgecolor='black')
+    plt.title('Performance by Number of Implements Owned', fontsize=14)
+    plt.xlabel('Number of Implements Owned', fontsize=12)
+    plt.ylabel('Average Acres Serviced', fontsize=12)
+    plt.xticks(rotation=0, fontsize=10)
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    return fig
+
+
+def acres_by_year_line(acres_by_year):
+    """Total acres serviced over the years."""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(10, 6))
+    acres_by_year.plot(kind='line', marker='o', color='green', linewidth=2)
+    plt.title('Total Acres Serviced Over the Years', fontsize=14)
+    plt.xlabel('Year', fontsize=12)
+    plt.ylabel('Total Acres Serviced', fontsize=12)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    return fig
+
+
+def acres_boxplot(df):
+    """Distribution of serviced acres per year."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig = plt.figure(figsize=(10, 6))
+    sns.boxplot(data=df[YEARLY_ACRES_COLUMNS], palette="Set3")
+    plt.title('Distribution of Acres Serviced (2022-2024)', fontsize=14)
+    plt.xlabel('Year', fontsize=12)
+    plt.ylabel('Acres Serviced', fontsize=12)
+    plt.tight_layout()
+    return fig
+
+
+def correlation_heatmap(corr):
+    """Correlation heatmap of the numeric columns' correlation matrix."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(corr, annot=True, cmap='coolwarm', fmt='.2f')
+    plt.title('Correlation Between Numeric Features', fontsize=14)
+    plt.tight_layout()
+    return fig
+
+
+def rental_pie(total_customers, rented_customers):
+    """Share of customers who rented an implement."""
+    import matplotlib.pyplot as plt
+
+    sizes = [rented_customers, total_customers - rented_customers]
+    labels = ['Rented Implement', 'Did Not Rent Implement']
+    colors = ['#66b3ff', '#99ff99']
+
+    fig = plt.figure(figsize=(5, 5))
+    plt.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=140, wedgeprops={'edgecolor': 'black'})
+    plt.title('Customers Who Rented an Implement')
+    plt.axis('equal')  # Equal aspect ratio ensures the pie chart is circular.
+    return fig
+
+
+def days_rented_hist(df, median):
+    """Distribution of rental duration with mean and median markers."""
+    import matplotlib.pyplot as plt
+
+    days = df['Days rented']
+    fig = plt.figure(figsize=(8, 6))
+    plt.hist(days.dropna(), bins=20, color='skyblue', edgecolor='black')
+    plt.axvline(days.mean(), color='red', linestyle='dashed', linewidth=2, label=f"Mean: {days.mean():.2f}")
+    plt.axvline(median, color='green', linestyle='dashed', linewidth=2, label=f"Median: {median:.2f}")
+    plt.title("Distribution of Rental Duration (Days rented)")
+    plt.xlabel('Rental Duration (Days)')
+    plt.ylabel('Frequency')
+    plt.legend()
+    plt.grid(True)
+    return fig
+
+
+def rented_acres_hist(df):
+    """Distribution of acres serviced with rented implements."""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(6, 4))
+    df['Acres  serviced'].hist(bins=10, color='skyblue', edgecolor='black')
+    plt.title('Distribution of Acres Serviced with Rented Implements')
+    plt.xlabel('Acres')
+    plt.ylabel('Frequency')
+    return fig
+
+
+def rented_acres_boxplot(df):
+    """Spread of acres serviced by rent status."""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(8, 6))
+    df.boxplot(column='Acres  serviced', by='Rented Implement?', patch_artist=True,
+               ax=fig.gca(),
+               boxprops=dict(facecolor='#66b3ff', color='black'),
+               flierprops=dict(markerfacecolor='red', marker='o', markersize=6),
+               whiskerprops=dict(color='black'),
+               capprops=dict(color='black'))
+    plt.title('Acres Serviced by Rent Status')
+    plt.suptitle('')  # Remove default title
+    plt.xlabel('Rented Implement?')
+    plt.ylabel('Acres Serviced')
+    return fig
+
+
+def regression_scatter(df):
+    """Implements owned vs total acres with a fitted regression line."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig = plt.figure(figsize=(8, 6))
+    sns.scatterplot(x='No. of implements owned', y='Total Acres Serviced', data=df, color='blue')
+
+    # Add a linear regression line for better understanding of the relationship
+    sns.regplot(x='No. of implements owned', y='Total Acres Serviced', data=df, scatter=False, color='red', line_kws={"color": "red", "lw": 2})
+
+    plt.xlabel('Number of Implements Owned')
+    plt.ylabel('Total Acres Serviced')
+    plt.title('Relationship between Implements Owned and Acres Serviced')
+    plt.grid(True)
+    return fig
@@ -0,0 +1,112 @@
+"""Stage-level timing and memory instrumentation.
+
+A ``Profiler`` records, for every stage run inside ``profiler.stage(name)``,
+the wall time, CPU time of this process and of finished worker processes, the
+process's peak resident set size and how much the stage raised it, and the
+number of rows the stage processed. The records can be written as JSON or CSV,
+and the whole run can optionally be profiled with cProfile as well.
+
+Code that is not being profiled uses ``NULL_PROFILER``, whose stages do
+nothing, so the instrumentation can stay in place unconditionally.
+"""
+
+import contextlib
+import csv
+import json
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+FIELDS = ['stage', 'wall_s', 'cpu_s', 'cpu_children_s', 'peak_rss_mb', 'rss_growth_mb', 'rows']
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / (1 << 20) if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+class Profiler:
+    """Collects one record per stage; see the module docstring."""
+
+    enabled = True
+
+    def __init__(self, cprofile_path=None):
+        self.records = []
+        self.cprofile_path = cprofile_path
+        self._cprofile = None
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        """Time the body of the ``with`` block as stage ``name``."""
+        start_times = os.times()
+        start_wall = time.perf_counter()
+        start_peak = peak_rss_mb()
+        record = {'stage': name, 'rows': rows}
+        try:
+            yield record
+        finally:
+            end_times = os.times()
+            peak = peak_rss_mb()
+            record.update(
+                wall_s=time.perf_counter() - start_wall,
+                cpu_s=(end_times.user - start_times.user) + (end_times.system - start_times.system),
+                cpu_children_s=(end_times.children_user - start_times.children_user)
+                + (end_times.children_system - start_times.children_system),
+                peak_rss_mb=peak,
+                rss_growth_mb=None if peak is None else peak - start_peak,
+            )
+            self.records.append({field: record.get(field) for field in FIELDS})
+
+    def start(self):
+        """Start the optional cProfile run."""
+        if self.cprofile_path:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        """Stop the cProfile run and dump its statistics."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+
+    def write(self, path):
+        """Write the records as CSV if ``path`` ends in .csv, else as JSON."""
+        if str(path).lower().endswith('.csv'):
+            with open(path, 'w', newline='') as fh:
+                writer = csv.DictWriter(fh, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, 'w') as fh:
+                json.dump(self.records, fh, indent=2)
+
+
+class NullProfiler:
+    """Profiler stand-in that records nothing."""
+
+    enabled = False
+    records = []
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        yield {}
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
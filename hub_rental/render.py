@@ -0,0 +1,129 @@
+"""Headless rendering of every report chart to image files.
+
+Each chart of ``hub_rental.plots`` is drawn with the Agg backend in a worker
+process and saved as PNG and/or SVG in an output directory. The inputs of a
+chart (its aggregate or the few columns it plots) are fingerprinted, and a
+chart whose fingerprint and formats match the previous render is skipped.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from hub_rental import stages
+from hub_rental.correlation import correlation_matrix
+from hub_rental.schema import YEARLY_ACRES_COLUMNS
+
+MANIFEST_NAME = "render_manifest.json"
+
+# Bump when the plotting code changes so every chart is re-rendered
+RENDER_VERSION = 1
+
+DEFAULT_FORMATS = ('png',)
+
+
+def figure_inputs(df, aggregates=None, duration=None):
+    """Chart name -> arguments of the ``hub_rental.plots`` function drawing it."""
+    if aggregates is None:
+        aggregates = stages.aggregate(df)
+    if duration is None:
+        duration = {'median': df['Days rented'].median()}
+    rented = int((df[stages.RENTED_COLUMN] == 'Yes').sum())
+    return {
+        'implements_bar': (aggregates['implement_performance'],),
+        'acres_by_year_line': (aggregates['acres_by_year'],),
+        'acres_boxplot': (df[YEARLY_ACRES_COLUMNS],),
+        'correlation_heatmap': (correlation_matrix(df),),
+        'rental_pie': (len(df), rented),
+        'days_rented_hist': (df[['Days rented']], duration['median']),
+        'rented_acres_hist': (df[['Acres  serviced']],),
+        'rented_acres_boxplot': (df[['Acres  serviced', stages.RENTED_COLUMN]],),
+        'regression_scatter': (df[['No. of implements owned', 'Total Acres Serviced']],),
+    }
+
+
+def fingerprint(args):
+    """Content hash of a chart's arguments."""
+    digest = hashlib.sha256(f"v{RENDER_VERSION}".encode())
+    for arg in args:
+        if isinstance(arg, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(arg, index=True).to_numpy().tobytes())
+            names = arg.columns if isinstance(arg, pd.DataFrame) else [arg.name]
+            digest.update(repr([*names, *arg.index.names]).encode())
+        else:
+            digest.update(pickle.dumps(arg))
+    return digest.hexdigest()
+
+
+def _render_one(name, args, out_dir, formats):
+    # Runs in a worker process
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from hub_rental import plots
+
+    fig = getattr(plots, name)(*args)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        tmp = f"{path}.tmp.{fmt}"
+        fig.savefig(tmp, format=fmt)
+        os.replace(tmp, path)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_all(df, out_dir, formats=DEFAULT_FORMATS, workers=None, aggregates=None, duration=None,
+               force=False):
+    """Render every chart of the report into ``out_dir``.
+
+    Returns a dict mapping each chart name to 'rendered' or 'unchanged'.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    formats = tuple(formats)
+    manifest = _read_manifest(out_dir)
+    status = {}
+    pending = {}
+    for name, args in figure_inputs(df, aggregates, duration).items():
+        entry = {'hash': fingerprint(args), 'formats': sorted(formats)}
+        files_exist = all(os.path.exists(os.path.join(out_dir, f"{name}.{fmt}")) for fmt in formats)
+        if not force and manifest.get(name) == entry and files_exist:
+            status[name] = 'unchanged'
+        else:
+            pending[name] = (args, entry)
+
+    if pending:
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        if workers == 1:
+            for name, (args, _) in pending.items():
+                _render_one(name, args, out_dir, formats)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {name: pool.submit(_render_one, name, args, out_dir, formats)
+                           for name, (args, _) in pending.items()}
+                for future in futures.values():
+                    future.result()
+        for name, (_, entry) in pending.items():
+            manifest[name] = entry
+            status[name] = 'rendered'
+
+        path = os.path.join(out_dir, MANIFEST_NAME)
+        with open(path + '.tmp', 'w') as fh:
+            json.dump(manifest, fh, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+    return status
@@ -0,0 +1,195 @@
+"""Console output for the analysis stages.
+
+Every function prints the results of one stage in the same format the
+original notebook used, with ``tabulate`` for the summary tables.
+"""
+
+from tabulate import tabulate
+
+
+def print_overview(df):
+    """Preview, dtypes and column names of the cleaned dataset."""
+    # Using tabulate for a clean table-like display
+    print(tabulate(df.head(), headers='keys', tablefmt='pipe'))
+    df.info()
+    print(df.columns)
+
+
+def print_aggregates(results, preview=None):
+    """Summary statistics, missing data and the acreage aggregates.
+
+    ``preview`` is an optional frame of the first rows, printed after the
+    summary statistics.
+    """
+    acres_by_year = results['acres_by_year']
+    implement_performance = results['implement_performance']
+    missing_data = results['missing_data']
+
+    print("\nSummary Statistics:\n", results['summary'])
+    if preview is not None:
+        print("\nDataset Preview:\n", preview)
+    print("\nMissing Data:\n", missing_data)
+    print("\nAcres Serviced by Year:\n", acres_by_year)
+    print("\nPerformance by Implements Owned:\n", implement_performance)
+
+    overview = results['overview']
+    summary_stats = [
+        ["Total Records", overview['records']],
+        ["Average ID", f"{overview['id_mean']:,.0f}"],
+        ["Date Range (Entry)", f"{overview['entry_date_min'].date()} to {overview['entry_date_max'].date()}"],
+        ["Average Year", f"{overview['year_mean']:.2f}"],
+        ["Average Total Acres Serviced", f"{overview['total_acres_mean']:.2f}"]
+    ]
+    missing_data_summary = [[col, missing] for col, missing in missing_data.items() if missing > 0]
+    acres_by_year_summary = [[year, f"{acres:,.2f}"] for year, acres in acres_by_year.items()]
+    performance_summary = [[implements, f"{avg:,.2f}"] for implements, avg in implement_performance.items()]
+
+    print("### Summary Statistics")
+    print(tabulate(summary_stats, headers=["Metric", "Value"], tablefmt="fancy_grid"))
+
+    print("\n### Missing Data")
+    print(tabulate(missing_data_summary, headers=["Field", "Missing Values"], tablefmt="fancy_grid"))
+
+    print("\n### Acres Serviced by Year")
+    print(tabulate(acres_by_year_summary, headers=["Year", "Total Acres Serviced"], tablefmt="fancy_grid"))
+
+    print("\n### Performance by Implements Owned")
+    print(tabulate(performance_summary, headers=["Implements Owned", "Average Total Acres Serviced"], tablefmt="fancy_grid"))
+
+
+def print_breakdowns(results):
+    """One table per group-by breakdown."""
+    for name, series in results.items():
+        keys = list(series.index.names)
+        rows = [[*(key if isinstance(key, tuple) else (key,)), f"{value:,.2f}"] for key, value in series.items()]
+        print(f"\n### {name.replace('_', ' ').capitalize()}")
+        print(tabulate(rows, headers=[*keys, series.name], tablefmt="fancy_grid"))
+
+
+def _print_ttest(results):
+    print(f"T-statistic: {results['t_stat']:.2f}")
+    print(f"P-value: {results['p_value']:.4f}")
+
+    # Interpretation of the t-test result
+    if results['p_value'] < 0.05:
+        print("There is a significant difference in acres serviced between customers who rented and did not rent an implement.")
+    else:
+        print("There is no significant difference in acres serviced between the two groups.")
+
+
+def print_rental_ttest(results):
+    """Rented vs non-rented comparison of 'Total Acres Serviced'."""
+    total_customers = results['total_customers']
+    rented_customers = results['rented_customers']
+
+    print(f"Mean Acres Serviced (Rented Implements): {results['mean_rented']:.2f}")
+    print(f"Mean Acres Serviced (Non-Rented Implements): {results['mean_non_rented']:.2f}")
+    print(f"Standard Deviation (Rented Implements): {results['std_rented']:.2f}")
+    print(f"Standard Deviation (Non-Rented Implements): {results['std_non_rented']:.2f}")
+
+    print(f"Total Customers: {total_customers}")
+    print(f"Customers who rented an implement: {rented_customers}")
+    print(f"Percentage of customers who rented an implement: {100 * rented_customers / total_customers:.2f}%")
+    _print_ttest(results)
+
+    # Display confidence intervals for the means of each group
+    print(f"95% Confidence Interval for Rented Implements: {results['conf_int_rented']}")
+    print(f"95% Confidence Interval for Non-Rented Implements: {results['conf_int_non_rented']}")
+
+
+SEGMENT_COLUMNS = ['dimension', 'segment', 'n_rented', 'n_non_rented', 'mean_diff',
+                   'p_welch', 'p_mannwhitney', 'cohens_d']
+
+
+def print_segment_tests(results):
+    """Rented vs non-rented tests per segment, for segments with both groups."""
+    both = results[(results['n_rented'] > 1) & (results['n_non_rented'] > 1)]
+    print("\n### Rented vs Non-Rented by Segment")
+    print(tabulate(both[SEGMENT_COLUMNS], headers='keys', tablefmt='fancy_grid', showindex=False, floatfmt='.4f'))
+
+
+def print_resampling(results):
+    """Bootstrap intervals and permutation p-values, one row per statistic."""
+    print("\n### Bootstrap Confidence Intervals and Permutation Tests")
+    print(tabulate(results.astype(object), headers='keys', tablefmt='fancy_grid', floatfmt='.4f'))
+
+
+def print_rental_duration(results):
+    """Descriptive statistics and outliers for 'Days rented'."""
+    print("\nRental Duration Statistics:\n", results['describe'])
+    print(f"Median Rental Duration: {results['median']:.2f} days")
+    print(f"Standard Deviation of Rental Duration: {results['std']:.2f} days")
+    print(f"Skewness of Rental Duration: {results['skew']:.2f}")
+    print(f"Kurtosis of Rental Duration: {results['kurtosis']:.2f}")
+    if 'rank_error' in results:
+        print(f"Quartiles are estimated to within {results['rank_error']:.2%} of the rows.")
+    if 'outlier_path' in results:
+        print(f"\n{results['outlier_count']} potential outliers (rental duration) written to '{results['outlier_path']}'.")
+    else:
+        print(f"\nPotential Outliers (Rental Duration):\n{results['outliers']}")
+
+
+def print_rented_acres(df, results):
+    """Rented vs non-rented comparison of 'Acres  serviced' with effect size."""
+    print(f"Total Acres Serviced with Rented Implements: {df['Acres  serviced'].sum()}")
+
+    print("Descriptive Statistics for Rented Implements Customers:")
+    print(results['rented'].describe())
+
+    print("\nDescriptive Statistics for Non-Rented Implements Customers:")
+    print(results['non_rented'].describe())
+
+    shapiro_rented = results['shapiro_rented']
+    shapiro_non_rented = results['shapiro_non_rented']
+    print(f"\nShapiro-Wilk Test for Normality (Rented Implements): Statistic={shapiro_rented[0]:.3f}, p-value={shapiro_rented[1]:.4f}")
+    print(f"Shapiro-Wilk Test for Normality (Non-Rented Implements): Statistic={shapiro_non_rented[0]:.3f}, p-value={shapiro_non_rented[1]:.4f}")
+
+    print()
+    _print_ttest(results)
+
+    cohens_d = results['cohens_d']
+    print(f"\nCohen's d (Effect Size): {cohens_d:.2f}")
+
+    # Interpretation of Cohen's d:
+    if cohens_d < 0.2:
+        print("The effect size is small.")
+    elif cohens_d < 0.5:
+        print("The effect size is medium.")
+    else:
+        print("The effect size is large.")
+
+
+def print_regression(results):
+    """Correlation and linear regression of implements owned vs acres."""
+    print(f"Pearson Correlation between Total Acres Serviced and Number of Implements Owned: {results['pearson']:.4f}")
+    if 'spearman' in results:
+        # Rank correlations are not available from incremental state
+        print(f"Spearman Rank Correlation between Total Acres Serviced and Number of Implements Owned: {results['spearman']:.4f}")
+
+    print(f"\nLinear Regression Results:")
+    print(f"Slope: {results['slope']:.4f}")
+    print(f"Intercept: {results['intercept']:.4f}")
+
+    r_squared = results['r_squared']
+    print(f"R-squared value: {r_squared:.4f}")
+
+    # Interpretation of R-squared
+    if r_squared < 0.2:
+        print("The relationship between the variables is weak.")
+    elif r_squared < 0.5:
+        print("The relationship between the variables is moderate.")
+    else:
+        print("The relationship between the variables is strong.")
+
+
+def print_regional_regression(fits):
+    """Implements vs acres fit per region, for regions where a line can be fitted."""
+    print("\n### Implements vs Total Acres by Region")
+    fitted = fits.dropna(subset=['slope']).astype(object)
+    print(tabulate(fitted, headers='keys', tablefmt='fancy_grid', floatfmt='.4f'))
+
+
+def print_profile(records):
+    """Timing and memory of each profiled stage."""
+    print("\n### Stage Profile")
+    print(tabulate(records, headers='keys', tablefmt='fancy_grid', floatfmt='.3f'))
@@ -0,0 +1,94 @@
+"""Declared schema of the hub rental export.
+
+Column names are given in their cleaned form (newlines replaced by spaces,
+surrounding whitespace stripped); ``reconcile_column`` maps the other
+spellings found in the workbooks onto them. The readers in ``hub_rental.ingest`` pass
+these dtypes and date formats straight to pandas so every column is parsed
+into its final type in one pass, instead of being read as text and coerced
+afterwards.
+
+Integer columns use the smallest nullable integer type that fits them, and the
+low-cardinality text columns are categoricals. Acreage stays ``float64``: the
+report prints sums of these columns and ``float32`` would change the totals.
+"""
+
+import pandas as pd
+
+YEARLY_ACRES_COLUMNS = ['2022 Acres serviced', '2023 Acres serviced', '2024 Acres serviced']
+
+CATEGORY_COLUMNS = [
+    '1st Implement', '2nd Implement', 'Region of operation', 'Country',
+    'Rented Implement?', 'Implement rented',
+]
+
+# Column name -> dtype, for every non-date column of the export
+DTYPES = {
+    'ID': 'Int32',
+    'Duration in programme': 'Int16',
+    'No. of implements owned': 'Int8',
+    **{col: 'float64' for col in YEARLY_ACRES_COLUMNS},
+    'Days rented': 'Int16',
+    'Acres  serviced': 'float64',
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+}
+
+# Date column name -> strptime format used by the CSV export
+DATE_FORMATS = {
+    'Entry Date': '%Y-%m-%d',
+    'Date of Extract': '%Y-%m-%d',
+}
+
+NUMERIC_COLUMNS = [col for col, dtype in DTYPES.items() if dtype != 'category']
+
+
+def normalize_column(name):
+    """Clean a column name by removing extra spaces and newlines."""
+    return str(name).replace('\n', ' ').strip()
+
+
+def column_key(name):
+    """Spelling-insensitive key of a column name: lower case, single spaces."""
+    return ' '.join(str(name).lower().split())
+
+
+# Key -> cleaned name, for every column of the export
+KNOWN_COLUMNS = {column_key(col): col for col in [*DATE_FORMATS, *DTYPES, 'Total Acres Serviced']}
+
+
+def reconcile_column(name):
+    """Cleaned name of a column, mapping drifted spellings onto the schema's.
+
+    Workbooks from different years and hubs break, pad and capitalise the
+    headers differently ('Acres \\nserviced', 'Acres serviced', ' ID', ...);
+    every spelling with the same ``column_key`` gets the declared name.
+    """
+    return KNOWN_COLUMNS.get(column_key(name), normalize_column(name))
+
+
+def apply_schema(df):
+    """Coerce any column of ``df`` that does not yet have its declared type.
+
+    Frames produced by the typed readers already match the schema and are
+    returned untouched; this is the slow path for frames that came from
+    elsewhere or contained values the readers could not parse directly.
+    """
+    for col, fmt in DATE_FORMATS.items():
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            converted = pd.to_datetime(df[col], format=fmt, errors='coerce')
+            if converted.isna().sum() > df[col].isna().sum():
+                # The declared format did not match, let pandas infer it
+                converted = pd.to_datetime(df[col], format='mixed')
+            df[col] = converted
+    for col, dtype in DTYPES.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype == 'category':
+            df[col] = df[col].astype('category')
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        try:
+            df[col] = values.astype(dtype)
+        except (TypeError, ValueError):
+            # Fractional or out-of-range values: keep them as floats
+            df[col] = values
+    return df
@@ -0,0 +1,357 @@
+"""Long-running HTTP/JSON service answering the report's summary queries.
+
+``python -m hub_rental.server`` loads and cleans the dataset once (through the
+local cache) and keeps it in memory, so a dashboard polling the numbers pays
+neither the interpreter start, the imports nor the parse on every request.
+
+Each endpoint is one of the report's tables::
+
+    GET /summary                  summary statistics table
+    GET /missing-data             missing values per column
+    GET /acres-by-year            total acres serviced per year
+    GET /implement-performance    mean acres serviced by implements owned
+    GET /rental-ttest             rented vs not rented t-test
+    GET /rollup                   acres, days rented and rentals over a date range
+    GET /health                   rows, load time and cache counters
+
+The tables take any number of ``region`` and ``year`` parameters to restrict
+the rows, e.g. ``/acres-by-year?region=Nakuru&region=Kisumu``. Results come
+from an ``AggregateCache`` keyed by the digest of the sources and the filters,
+so a cached answer is found without touching the rows; they are only filtered
+when a table has to be computed. The unfiltered tables are computed as soon as
+a dataset is loaded.
+
+``/rollup`` is answered from the ``hub_rental.rollups`` cubes built at load
+time and takes ``start`` and ``end`` dates, a ``grain``, any number of ``by``
+dimensions (period, region, implement) and ``region`` / ``implement``
+members, e.g. ``/rollup?start=2024-01-01&end=2024-03-31&by=period&by=region&grain=monthly``.
+A range that does not begin and finish on the periods of the ``grain`` is a
+400 error.
+
+A background thread reloads the sources every ``refresh_interval`` seconds.
+Remote sheets are requested conditionally and local files are only re-hashed
+when their size or mtime changed, so unchanged sources cost one 304 response
+(or a stat) and the served frame is not read or hashed again; a changed dataset replaces the served one in a single reference
+swap and requests in flight finish on the snapshot they started with. A
+failed reload keeps the current dataset.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import sys
+import threading
+import time
+import warnings
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from hub_rental.cache import DEFAULT_CACHE_DIR, dataset_hash, load_datasets
+from hub_rental.fetch import DEFAULT_CONCURRENCY
+from hub_rental.ingest import SHEET_URL
+from hub_rental.memo import AggregateCache
+from hub_rental.rollups import GRAINS, Rollups
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8050
+
+# Seconds between background reloads of the sources
+DEFAULT_REFRESH_INTERVAL = 300
+
+# Endpoint -> cached aggregate it serves
+QUERIES = {
+    "summary": "summary",
+    "missing-data": "missing_data",
+    "acres-by-year": "acres_by_year",
+    "implement-performance": "implement_performance",
+    "rental-ttest": "rental_ttest",
+}
+
+# Query parameter -> column it filters
+FILTERS = {
+    "region": "Region of operation",
+    "year": "Year",
+}
+
+# Parameters of the rollup endpoint; the repeatable ones are lists
+ROLLUP_PARAMS = frozenset({"start", "end", "grain"})
+ROLLUP_LISTS = frozenset({"by", "region", "implement"})
+
+# Row-level values of an aggregate that are not sent to clients
+ROW_LEVEL_KEYS = frozenset({"rented", "non_rented"})
+
+logger = logging.getLogger(__name__)
+
+
+def to_json(value):
+    """``value`` (an aggregate result) as plain JSON-serialisable data.
+
+    Frames become their 'split' layout (columns, index and data), Series a
+    mapping of index to value and missing or infinite numbers ``None``.
+    """
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="split", date_format="iso"))
+    if isinstance(value, pd.Series):
+        return json.loads(value.to_json(orient="index", date_format="iso"))
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items() if k not in ROW_LEVEL_KEYS}
+    if hasattr(value, "_asdict"):
+        # Named results such as scipy's ShapiroResult
+        return to_json(value._asdict())
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def parse_filters(query):
+    """Filters ``{column: values}`` from a query string; raises ValueError on bad ones."""
+    params = parse_qs(query)
+    unknown = set(params) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    filters = {}
+    for name, values in params.items():
+        if name == "year":
+            try:
+                values = [int(v) for v in values]
+            except ValueError:
+                raise ValueError(f"year must be an integer, got {values}") from None
+        filters[FILTERS[name]] = tuple(sorted(set(values)))
+    return filters
+
+
+def parse_rollup(query):
+    """Keyword arguments of ``Rollups.query`` from a query string; raises ValueError on bad ones."""
+    params = parse_qs(query)
+    unknown = set(params) - ROLLUP_PARAMS - ROLLUP_LISTS
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    kwargs = {name: values if name in ROLLUP_LISTS else values[-1] for name, values in params.items()}
+    for name in ("start", "end"):
+        if name in kwargs:
+            kwargs[name] = pd.Timestamp(kwargs[name])
+    if kwargs.get("grain", "daily") not in GRAINS:
+        raise ValueError(f"grain must be one of {', '.join(GRAINS)}")
+    return kwargs
+
+
+def rollup_json(result):
+    """A rollup result as a mapping of measures, or a list of one record per row."""
+    if isinstance(result, pd.Series):
+        return to_json(result)
+    records = result.reset_index()
+    if "period" in records.columns:
+        records["period"] = records["period"].astype(str)
+    return json.loads(records.to_json(orient="records"))
+
+
+class Snapshot:
+    """One loaded dataset with the ``dataset_hash`` of its sources."""
+
+    def __init__(self, df, frame_hash):
+        self.df = df
+        self.frame_hash = frame_hash
+        self.loaded_at = time.time()
+        self.rollups = None
+
+    def key(self, filters):
+        """Cache key of the rows selected by ``filters`` (as from ``parse_filters``)."""
+        if not filters:
+            return self.frame_hash
+        return hashlib.sha256(repr((self.frame_hash, sorted(filters.items()))).encode()).hexdigest()
+
+    def select(self, filters):
+        """Rows matching every filter."""
+        if not filters:
+            return self.df
+        mask = pd.Series(True, index=self.df.index)
+        for column, values in filters.items():
+            mask &= self.df[column].isin(values)
+        return self.df[mask]
+
+
+class ReportService:
+    """The warm dataset of ``sources`` and the cached answers to queries on it."""
+
+    def __init__(self, sources, cache_dir=DEFAULT_CACHE_DIR, refresh_interval=DEFAULT_REFRESH_INTERVAL,
+                 concurrency=DEFAULT_CONCURRENCY, cache=None):
+        self.sources = list(sources)
+        self.cache_dir = cache_dir
+        self.refresh_interval = refresh_interval
+        self.concurrency = concurrency
+        self.cache = AggregateCache() if cache is None else cache
+        self.snapshot = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def reload(self):
+        """Load the sources; returns True when the dataset changed."""
+        current = self.snapshot
+        df = load_datasets(self.sources, cache_dir=self.cache_dir, concurrency=self.concurrency,
+                           unchanged=None if current is None else current.frame_hash)
+        if df is None:
+            current.loaded_at = time.time()
+            return False
+        snapshot = Snapshot(df, dataset_hash(self.sources, self.cache_dir))
+        for query in QUERIES:
+            self._compute(snapshot, query, {})
+        snapshot.rollups = Rollups(df)
+        self.snapshot = snapshot
+        return True
+
+    def _compute(self, snapshot, query, filters):
+        # The cache is thread-safe, and a miss only blocks requests for the
+        # same query and filters; the rows are only selected on a miss
+        return self.cache.get(QUERIES[query], lambda: snapshot.select(filters), frame_hash=snapshot.key(filters))
+
+    def query(self, query, filters=None):
+        """Result of endpoint ``query`` on the rows selected by ``filters``."""
+        return self._compute(self.snapshot, query, filters or {})
+
+    def rollup(self, **kwargs):
+        """``Rollups.query`` on the current dataset's cubes."""
+        return self.snapshot.rollups.query(**kwargs)
+
+    def health(self):
+        snapshot = self.snapshot
+        return {
+            "rows": len(snapshot.df),
+            "fingerprint": snapshot.frame_hash,
+            "loaded_at": snapshot.loaded_at,
+            "sources": self.sources,
+            "cache": {"entries": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses},
+            "last_error": self.last_error,
+        }
+
+    def start(self):
+        """Load the dataset, then keep reloading it on a background thread."""
+        self.reload()
+        if self.refresh_interval:
+            self._thread = threading.Thread(target=self._refresh_loop, name="hub-rental-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                if self.reload():
+                    logger.info("dataset reloaded: %d rows", len(self.snapshot.df))
+                self.last_error = None
+            except Exception as error:  # keep serving the current dataset
+                self.last_error = f"{type(error).__name__}: {error}"
+                logger.warning("reload failed: %s", self.last_error)
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """Answers GET requests from the ``ReportService`` of its server."""
+
+    server_version = "HubRental/1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.strip("/")
+        service = self.server.service
+        if endpoint == "health":
+            return self._send(HTTPStatus.OK, service.health())
+        if endpoint == "":
+            return self._send(HTTPStatus.OK, {"endpoints": sorted(QUERIES) + ["rollup", "health"],
+                                              "filters": sorted(FILTERS)})
+        if endpoint == "rollup":
+            return self._rollup(url.query)
+        if endpoint not in QUERIES:
+            return self._send(HTTPStatus.NOT_FOUND, {"error": f"unknown endpoint {endpoint!r}"})
+        try:
+            filters = parse_filters(url.query)
+        except ValueError as error:
+            return self._send(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        try:
+            result = service.query(endpoint, filters)
+        except (ValueError, TypeError, ZeroDivisionError) as error:
+            # e.g. too few rows left by the filters for the t-test
+            return self._send(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(error)})
+        self._send(HTTPStatus.OK, {"query": endpoint, "filters": {k: list(v) for k, v in filters.items()},
+                                   "result": to_json(result)})
+
+    def _rollup(self, query):
+        try:
+            kwargs = parse_rollup(query)
+            result = self.server.service.rollup(**kwargs)
+        except ValueError as error:
+            return self._send(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        self._send(HTTPStatus.OK, {"query": "rollup", "result": rollup_json(result)})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """A threading HTTP server answering queries from ``service``."""
+    server = ThreadingHTTPServer((host, port), ReportHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m hub_rental.server",
+        description="Serve the report's summary tables as JSON from a dataset kept in memory.",
+    )
+    parser.add_argument("--source", nargs="+", default=[SHEET_URL], metavar="SOURCE",
+                        help="Google Sheet CSV URL, CSV file, Excel workbook or directory of workbooks "
+                             "(default: the hub sheet)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory of the local dataset cache")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on (default: %(default)s)")
+    parser.add_argument("--refresh-interval", type=float, default=DEFAULT_REFRESH_INTERVAL,
+                        help="seconds between background reloads of the sources, 0 to never reload "
+                             "(default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="remote sources downloaded at the same time (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # Shapiro-Wilk warns about its p-value on large selections of every query
+    warnings.filterwarnings("ignore", message="scipy.stats.shapiro")
+    service = ReportService(args.source, cache_dir=args.cache_dir, refresh_interval=args.refresh_interval,
+                            concurrency=args.concurrency)
+    service.start()
+    server = make_server(service, args.host, args.port)
+    logger.info("serving %d rows on http://%s:%d/", len(service.snapshot.df), args.host, server.server_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
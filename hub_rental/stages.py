@@ -0,0 +1,212 @@
+"""Analysis stages of the hub rental report.
+
+Each stage takes the cleaned DataFrame and returns its results as a dict, so
+the stages can be run, skipped or reused independently of the printing and
+plotting code. scipy is only imported by the stages that need it.
+"""
+
+from hub_rental.ingest import clean_frame
+from hub_rental.parallel import breakdown
+
+# 'Rented Implement?' holds 'Yes' or 'No'
+RENTED_COLUMN = 'Rented Implement?'
+
+
+def clean(df):
+    """Clean a raw export (column names, dates, numeric columns, totals)."""
+    return clean_frame(df)
+
+
+def summary(df):
+    """Summary statistics of every column."""
+    return df.describe()
+
+
+def missing_data(df):
+    """Missing values per column."""
+    return df.isnull().sum()
+
+
+def acres_by_year(df):
+    """Total acres serviced by year."""
+    return breakdown(df, 'acres_by_year')
+
+
+def implement_performance(df):
+    """Mean acres serviced by the number of implements owned."""
+    return breakdown(df, 'implement_performance')
+
+
+def aggregate(df):
+    """Summary statistics, missing data and the acreage aggregates."""
+    return {
+        'overview': overview(df),
+        'summary': summary(df),
+        'missing_data': missing_data(df),
+        'acres_by_year': acres_by_year(df),
+        'implement_performance': implement_performance(df),
+    }
+
+
+def breakdowns(df, workers=None):
+    """Acreage by year, implements, region, first implement and their combination.
+
+    The group-bys are spread over ``workers`` processes (all cores by default)
+    on large frames; see ``hub_rental.parallel``.
+    """
+    from hub_rental.parallel import breakdowns as parallel_breakdowns
+
+    return parallel_breakdowns(df, workers=workers)
+
+
+def overview(df):
+    """Headline figures of the summary statistics table."""
+    return {
+        'records': len(df),
+        'id_mean': df['ID'].mean(),
+        'entry_date_min': df['Entry Date'].min(),
+        'entry_date_max': df['Entry Date'].max(),
+        'year_mean': df['Year'].mean(),
+        'total_acres_mean': df['Total Acres Serviced'].mean(),
+    }
+
+
+def rental_split(df, column):
+    """Values of ``column`` for customers who did and did not rent, NaNs dropped."""
+    rented = df.loc[df[RENTED_COLUMN] == 'Yes', column].dropna()
+    non_rented = df.loc[df[RENTED_COLUMN] == 'No', column].dropna()
+    return rented, non_rented
+
+
+def rental_ttest(df, column='Total Acres Serviced'):
+    """Compare ``column`` between customers who rented and did not rent.
+
+    Returns the group means and standard deviations, the t-test, 95% confidence
+    intervals for both means, Shapiro-Wilk normality tests and Cohen's d.
+    """
+    from scipy import stats
+
+    rented, non_rented = rental_split(df, column)
+    mean_rented = rented.mean()
+    mean_non_rented = non_rented.mean()
+
+    # Perform the t-test between the two groups
+    t_stat, p_value = stats.ttest_ind(rented, non_rented, nan_policy='omit')
+
+    # Calculate the 95% confidence intervals for the means of both groups
+    conf_int_rented = stats.t.interval(0.95, len(rented) - 1, loc=mean_rented, scale=stats.sem(rented))
+    conf_int_non_rented = stats.t.interval(0.95, len(non_rented) - 1, loc=mean_non_rented, scale=stats.sem(non_rented))
+
+    # Effect Size (Cohen's d)
+    pooled_std = ((rented.std() ** 2 + non_rented.std() ** 2) / 2) ** 0.5
+    cohens_d = (mean_rented - mean_non_rented) / pooled_std
+
+    total_customers = len(df)
+    rented_customers = int((df[RENTED_COLUMN] == 'Yes').sum())
+
+    return {
+        'column': column,
+        'rented': rented,
+        'non_rented': non_rented,
+        'mean_rented': mean_rented,
+        'mean_non_rented': mean_non_rented,
+        'std_rented': rented.std(),
+        'std_non_rented': non_rented.std(),
+        't_stat': t_stat,
+        'p_value': p_value,
+        'conf_int_rented': conf_int_rented,
+        'conf_int_non_rented': conf_int_non_rented,
+        'shapiro_rented': stats.shapiro(rented),
+        'shapiro_non_rented': stats.shapiro(non_rented),
+        'cohens_d': cohens_d,
+        'total_customers': total_customers,
+        'rented_customers': rented_customers,
+    }
+
+
+def segment_tests(df, column='Total Acres Serviced'):
+    """Rented vs non-rented tests for every region, implement type and year.
+
+    One tidy frame with a row per segment; see ``hub_rental.batchstats``.
+    """
+    from hub_rental.batchstats import batch_compare
+
+    return batch_compare(df, column=column)
+
+
+def resampling(df, n_resamples=10_000, seed=0, workers=None):
+    """Bootstrap CIs and permutation p-values of the rental comparison.
+
+    Covers the rented minus non-rented mean difference, Cohen's d and the
+    implements-vs-acres slope; see ``hub_rental.resampling``.
+    """
+    from hub_rental.resampling import resample_report
+
+    return resample_report(df, n_resamples=n_resamples, seed=seed, workers=workers)
+
+
+def rental_duration_stats(df):
+    """Descriptive statistics and IQR outliers for 'Days rented'."""
+    days = df['Days rented']
+
+    # Outlier Detection using IQR (Interquartile Range)
+    q1 = days.quantile(0.25)
+    q3 = days.quantile(0.75)
+    iqr = q3 - q1
+    lower_bound = q1 - 1.5 * iqr
+    upper_bound = q3 + 1.5 * iqr
+
+    return {
+        'describe': days.describe(),
+        'mean': days.mean(),
+        'median': days.median(),
+        'std': days.std(),
+        'skew': days.skew(),
+        'kurtosis': days.kurt(),
+        'q1': q1,
+        'q3': q3,
+        'lower_bound': lower_bound,
+        'upper_bound': upper_bound,
+        'outliers': df[(days < lower_bound) | (days > upper_bound)],
+    }
+
+
+def rental_duration_sketch(df, outlier_path, workers=None):
+    """``rental_duration_stats`` from mergeable quantile and moment sketches.
+
+    The outlier rows are written to ``outlier_path`` instead of being
+    returned; see ``hub_rental.sketches``.
+    """
+    from hub_rental.sketches import sketch_duration_stats
+
+    return sketch_duration_stats(df, outlier_path=outlier_path, workers=workers)
+
+
+def implements_regression(df):
+    """Correlation and linear regression of implements owned vs total acres.
+
+    The fit comes from the sufficient statistics of ``hub_rental.correlation``
+    and uses the rows where both columns are present.
+    """
+    from hub_rental.correlation import X_COLUMN, Y_COLUMN, CrossProducts, spearman
+
+    fit = CrossProducts([X_COLUMN, Y_COLUMN]).update(df).ols(X_COLUMN, Y_COLUMN).iloc[0]
+    return {
+        'pearson': fit['pearson'],
+        'spearman': spearman(df, X_COLUMN, Y_COLUMN).iloc[0],
+        'slope': fit['slope'],
+        'intercept': fit['intercept'],
+        'r_squared': fit['r_squared'],
+    }
+
+
+def regional_regression(df, by='Region of operation'):
+    """Implements vs total acres fit and correlations for every region.
+
+    All regions are fitted in one pass; one row per region.
+    """
+    from hub_rental.correlation import X_COLUMN, Y_COLUMN, CrossProducts, spearman
+
+    fits = CrossProducts([X_COLUMN, Y_COLUMN], by=by).update(df).ols(X_COLUMN, Y_COLUMN)
+    fits.insert(2, 'spearman', spearman(df, X_COLUMN, Y_COLUMN, by=by))
+    return fits.sort_index()
@@ -0,0 +1,204 @@
+"""Chunked, bounded-memory aggregation for exports larger than memory.
+
+The source is read ``chunksize`` rows at a time. Each cleaned chunk is reduced
+to a ``PartialAggregate`` (row and missing-value counts, per-column Welford
+moments, group sums and counts), and partials are merged as they arrive, so
+memory use depends on the chunk size and the number of groups only. The merged
+partial produces the same tables as ``hub_rental.stages.aggregate``.
+
+Exact quantiles cannot be merged across chunks, so the streamed summary table
+has the count, mean, std, min and max rows of ``DataFrame.describe`` only.
+"""
+
+import numpy as np
+import pandas as pd
+
+from hub_rental.ingest import (
+    clean_frame,
+    is_excel,
+    reader_kwargs,
+    source_columns,
+    source_opener,
+)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Cell values read as missing by pandas.read_csv/read_excel by default
+NA_STRINGS = [
+    '', ' ', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+
+def _csv_chunks(open_buffer, names, chunksize):
+    consumed = 0
+    typed = True
+    while True:
+        reader = pd.read_csv(open_buffer(), chunksize=chunksize, **reader_kwargs(names, typed=typed))
+        try:
+            with reader:
+                # After a restart, read past the rows already yielded a chunk
+                # at a time and drop them; a skiprows list of that length
+                # would grow with the export
+                skipped = 0
+                while skipped < consumed:
+                    skipped += len(reader.get_chunk(min(chunksize, consumed - skipped)))
+                while True:
+                    try:
+                        chunk = next(reader)
+                    except StopIteration:
+                        return
+                    consumed += len(chunk)
+                    yield chunk
+        except (TypeError, ValueError):
+            # A numeric cell did not parse as its declared type; carry on
+            # from the same row with the numeric columns read untyped
+            if not typed:
+                raise
+            typed = False
+
+
+def _excel_chunks(open_buffer, names, chunksize):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(open_buffer(), read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(min_row=2, values_only=True)
+        while True:
+            block = [row for _, row in zip(range(chunksize), rows)]
+            if not block:
+                return
+            frame = pd.DataFrame.from_records(block, columns=names)
+            # Treat the same strings as missing that pandas' readers do
+            for col in frame.select_dtypes(include='object'):
+                frame[col] = frame[col].mask(frame[col].isin(NA_STRINGS))
+            yield frame
+    finally:
+        workbook.close()
+
+
+def iter_chunks(source, chunksize=DEFAULT_CHUNKSIZE, data=None):
+    """Yield the cleaned dataset of ``source`` in frames of ``chunksize`` rows."""
+    open_buffer = source_opener(source, data)
+    excel = is_excel(source)
+    names = source_columns(open_buffer, excel)
+    chunks = (_excel_chunks if excel else _csv_chunks)(open_buffer, names, chunksize)
+    for chunk in chunks:
+        yield clean_frame(chunk)
+
+
+def _union(left, right):
+    # Union of two indexes that keeps the column order of the first chunk
+    return left.append(right.difference(left))
+
+
+class PartialAggregate:
+    """Mergeable aggregate state of one or more chunks."""
+
+    def __init__(self):
+        self.rows = 0
+        self.missing = pd.Series(dtype='int64')
+        # Per numeric column: count, mean, sum of squared deviations, min, max
+        self.count = pd.Series(dtype='float64')
+        self.mean = pd.Series(dtype='float64')
+        self.m2 = pd.Series(dtype='float64')
+        self.min = pd.Series(dtype='float64')
+        self.max = pd.Series(dtype='float64')
+        self.entry_date_min = pd.NaT
+        self.entry_date_max = pd.NaT
+        self.acres_by_year = pd.Series(dtype='float64')
+        self.implements_sum = pd.Series(dtype='float64')
+        self.implements_count = pd.Series(dtype='float64')
+
+    @classmethod
+    def from_chunk(cls, chunk):
+        """Reduce one cleaned chunk to its partial aggregate."""
+        part = cls()
+        part.rows = len(chunk)
+        part.missing = chunk.isnull().sum()
+
+        numeric = chunk.select_dtypes(include='number').astype('float64')
+        part.count = numeric.count().astype('float64')
+        part.mean = numeric.mean()
+        part.m2 = ((numeric - part.mean) ** 2).sum()
+        part.min = numeric.min()
+        part.max = numeric.max()
+
+        part.entry_date_min = chunk['Entry Date'].min()
+        part.entry_date_max = chunk['Entry Date'].max()
+
+        total = chunk['Total Acres Serviced']
+        part.acres_by_year = total.groupby(chunk['Year']).sum()
+        by_implements = total.groupby(chunk['No. of implements owned'])
+        part.implements_sum = by_implements.sum()
+        part.implements_count = by_implements.count().astype('float64')
+        return part
+
+    def merge(self, other):
+        """Combine ``other`` into this partial and return it."""
+        self.rows += other.rows
+        columns = _union(self.missing.index, other.missing.index)
+        self.missing = self.missing.reindex(columns, fill_value=0) + other.missing.reindex(columns, fill_value=0)
+
+        # Chan et al. pairwise combination of the Welford moments
+        n_a = self.count.reindex(_union(self.count.index, other.count.index), fill_value=0)
+        n_b = other.count.reindex(n_a.index, fill_value=0)
+        mean_a = self.mean.reindex(n_a.index).fillna(0)
+        mean_b = other.mean.reindex(n_a.index).fillna(0)
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = (mean_a + delta * n_b / n).where(n > 0)
+            self.m2 = (
+                self.m2.reindex(n.index, fill_value=0)
+                + other.m2.reindex(n.index, fill_value=0)
+                + delta ** 2 * n_a * n_b / n
+            ).where(n > 0, 0)
+        self.count = n
+        self.min = pd.concat([self.min, other.min], axis=1).min(axis=1).reindex(n.index)
+        self.max = pd.concat([self.max, other.max], axis=1).max(axis=1).reindex(n.index)
+
+        self.entry_date_min = pd.Series([self.entry_date_min, other.entry_date_min]).min()
+        self.entry_date_max = pd.Series([self.entry_date_max, other.entry_date_max]).max()
+
+        self.acres_by_year = self.acres_by_year.add(other.acres_by_year, fill_value=0)
+        self.implements_sum = self.implements_sum.add(other.implements_sum, fill_value=0)
+        self.implements_count = self.implements_count.add(other.implements_count, fill_value=0)
+        return self
+
+    def tables(self):
+        """The aggregate results, in the layout of ``stages.aggregate``."""
+        columns = self.count.index
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.m2 / (self.count - 1)).where(self.count > 1)
+        summary = pd.DataFrame(
+            [self.count, self.mean, std, self.min, self.max],
+            index=['count', 'mean', 'std', 'min', 'max'],
+        )[columns]
+
+        def mean_of(col):
+            return self.mean.get(col, np.nan)
+
+        return {
+            'overview': {
+                'records': self.rows,
+                'id_mean': mean_of('ID'),
+                'entry_date_min': self.entry_date_min,
+                'entry_date_max': self.entry_date_max,
+                'year_mean': mean_of('Year'),
+                'total_acres_mean': mean_of('Total Acres Serviced'),
+            },
+            'summary': summary,
+            'missing_data': self.missing,
+            'acres_by_year': self.acres_by_year.sort_index().rename_axis('Year'),
+            'implement_performance': (self.implements_sum / self.implements_count)
+                                     .sort_index().rename_axis('No. of implements owned'),
+        }
+
+
+def streaming_aggregate(source, chunksize=DEFAULT_CHUNKSIZE, data=None):
+    """Aggregate ``source`` chunk by chunk and return the merged tables."""
+    total = PartialAggregate()
+    for chunk in iter_chunks(source, chunksize, data):
+        total.merge(PartialAggregate.from_chunk(chunk))
+    return total.tables()
@@ -0,0 +1,120 @@
+"""Synthetic hub rental exports for benchmarking.
+
+``generate`` produces a raw frame laid out like the Google Sheet export (the
+same column names, including the embedded newlines) at any number of rows, so
+the report can be timed at scales the real dataset does not reach yet.
+
+The distributions follow the 2024 extract: most customers own one or two
+implements, almost all of them a plough; acreage is right-skewed with many
+zero years; about 5% of customers rented an implement, for a heavy-tailed
+number of days. A few percent of the acreage and first-implement cells are
+left empty and some implement names vary in case, as in the real sheet.
+"""
+
+import numpy as np
+import pandas as pd
+
+DATE_OF_EXTRACT = pd.Timestamp('2024-11-22')
+FIRST_ENTRY = pd.Timestamp('2022-01-01')
+FIRST_ID = 500_000
+
+# Country -> regions, and the share of customers in each country
+REGIONS = {
+    'Kenya': ['Kisumu', 'Siaya', 'Busia', 'Narok', 'Homabay', 'Bomet', 'Kakamega', 'Nyandarua', 'Nakuru'],
+    'Nigeria': ['Oyo', 'Awe', 'Nassarawa', 'Kwaba', 'Azara', 'Bauchi', 'Guma', 'Tafawa Balewa'],
+    'Uganda': ['Northern Region', 'Central Region', 'Masindi/ Western region'],
+    'Rwanda': ['Rwamagana', 'Kayonza', 'Nyagatare'],
+}
+COUNTRY_SHARES = [0.6, 0.26, 0.08, 0.06]
+
+# Implement name -> probability
+FIRST_IMPLEMENTS = {'Plough': 0.89, 'plough': 0.06, 'Rotavator': 0.02, 'Combined Harvester': 0.02, 'Ripper': 0.01}
+SECOND_IMPLEMENTS = {'Harrow': 0.74, 'Ripper': 0.14, 'Rotavator': 0.07, 'Ridger': 0.03, 'Subsoiler': 0.02}
+RENTED_IMPLEMENTS = {'Harrow': 0.35, 'Disc plough': 0.25, 'Ripper': 0.2, 'Rotavator': 0.2}
+
+RENTAL_RATE = 0.05
+MISSING_ACRES_RATE = 0.035
+MISSING_IMPLEMENT_RATE = 0.01
+
+# Column names exactly as they appear in the export
+COLUMNS = [
+    'ID', 'Entry Date', 'Date of Extract', 'Duration in programme', 'No. of implements owned',
+    '1st Implement', '2nd Implement', 'Region of operation', 'Country',
+    '2022\nAcres serviced', '2023\nAcres serviced', '2024\nAcres serviced',
+    'Rented Implement?', 'Implement\nrented', 'Days\nrented', 'Acres \nserviced',
+]
+
+
+def _choice(rng, options, size, missing=None):
+    # Categorical so that 10M-row frames do not hold 10M Python strings;
+    # rows where ``missing`` is True are left empty
+    codes = rng.choice(len(options), size=size, p=list(options.values()))
+    if missing is not None:
+        codes[missing] = -1
+    return pd.Categorical.from_codes(codes, categories=list(options))
+
+
+def _acres(rng, joined, year, size):
+    # Right-skewed acreage, zero for years before the customer joined and for
+    # about a third of the remaining customer-years
+    acres = rng.lognormal(mean=5.9, sigma=0.8, size=size)
+    acres[rng.random(size) < 0.35] = 0.0
+    acres[joined.year > year] = 0.0
+    acres[rng.random(size) < MISSING_ACRES_RATE] = np.nan
+    return acres
+
+
+def generate(rows, seed=0):
+    """A raw export of ``rows`` synthetic customers, reproducible from ``seed``."""
+    rng = np.random.default_rng(seed)
+    span = (DATE_OF_EXTRACT - FIRST_ENTRY).days
+    # More customers joined recently than at the start of the programme
+    joined = FIRST_ENTRY + pd.to_timedelta(np.floor(span * rng.power(1.6, rows)), unit='D')
+    joined = pd.DatetimeIndex(joined)
+
+    country_codes = rng.choice(len(REGIONS), size=rows, p=COUNTRY_SHARES)
+    region_names = [name for names in REGIONS.values() for name in names]
+    region_codes = np.empty(rows, dtype='int64')
+    offset = 0
+    for code, names in enumerate(REGIONS.values()):
+        mask = country_codes == code
+        # Within a country, a few regions hold most of the customers
+        weights = 1 / np.arange(1, len(names) + 1)
+        region_codes[mask] = offset + rng.choice(len(names), size=mask.sum(), p=weights / weights.sum())
+        offset += len(names)
+
+    owned = np.where(rng.random(rows) < 0.47, 2, 1)
+    first = _choice(rng, FIRST_IMPLEMENTS, rows, missing=rng.random(rows) < MISSING_IMPLEMENT_RATE)
+    second = _choice(rng, SECOND_IMPLEMENTS, rows, missing=owned == 1)
+
+    rented = rng.random(rows) < RENTAL_RATE
+    days = np.where(rented, np.minimum(np.ceil(rng.lognormal(1.7, 0.8, rows)), 365), 0).astype('int64')
+    rented_acres = np.where(rented, np.round(rng.lognormal(3.5, 1.1, rows), 2), 0.0)
+    implement_rented = _choice(rng, RENTED_IMPLEMENTS, rows, missing=~rented)
+
+    df = pd.DataFrame({
+        'ID': FIRST_ID + rng.permutation(rows),
+        'Entry Date': joined,
+        'Date of Extract': DATE_OF_EXTRACT,
+        'Duration in programme': (DATE_OF_EXTRACT - joined).days,
+        'No. of implements owned': owned,
+        '1st Implement': first,
+        '2nd Implement': second,
+        'Region of operation': pd.Categorical.from_codes(region_codes, categories=region_names),
+        'Country': pd.Categorical.from_codes(country_codes, categories=list(REGIONS)),
+        '2022\nAcres serviced': _acres(rng, joined, 2022, rows),
+        '2023\nAcres serviced': _acres(rng, joined, 2023, rows),
+        '2024\nAcres serviced': _acres(rng, joined, 2024, rows),
+        'Rented Implement?': pd.Categorical.from_codes(rented.astype('int8'), categories=['No', 'Yes']),
+        'Implement\nrented': implement_rented,
+        'Days\nrented': days,
+        'Acres \nserviced': rented_acres,
+    }, columns=COLUMNS)
+    return df.sort_values('Entry Date', kind='stable', ignore_index=True)
+
+
+def write_csv(path, rows, seed=0):
+    """Write ``generate(rows, seed)`` to ``path`` as the sheet's CSV export."""
+    from hub_rental.export import export_dataset
+
+    return export_dataset(generate(rows, seed), path, fmt='csv')
@@ -0,0 +1,82 @@
+"""Reading a directory of yearly and per-hub workbooks as one dataset.
+
+Every Excel workbook under a directory is parsed in a worker process, with
+the calamine reader when python-calamine is installed (it is several times
+faster than openpyxl) and pandas' default engine otherwise. Each sheet whose
+reconciled headers include the export's key columns becomes one frame, and
+the frames are stacked into one raw frame that ``clean_frame`` then types
+according to the schema. Other sheets (pivots, notes) are skipped.
+
+A directory's cache fingerprint is built from the names, sizes and mtimes of
+its workbooks, so an unchanged backfill is not re-read.
+"""
+
+import glob
+import hashlib
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from hub_rental.ingest import EXCEL_SUFFIXES
+from hub_rental.parallel import default_workers
+from hub_rental.schema import reconcile_column
+
+# A sheet is read as part of the dataset only if it has these columns
+REQUIRED_COLUMNS = ['ID', 'Entry Date']
+
+
+def excel_engine():
+    """'calamine' when python-calamine is installed, else None (pandas' default)."""
+    return 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+
+def discover(directory):
+    """Paths of the workbooks under ``directory``, recursively and sorted."""
+    paths = []
+    for suffix in EXCEL_SUFFIXES:
+        paths.extend(glob.glob(os.path.join(glob.escape(str(directory)), '**', f'*{suffix}'), recursive=True))
+    # Skip the lock files Excel leaves next to open workbooks
+    return sorted(path for path in set(paths) if not os.path.basename(path).startswith('~$'))
+
+
+def directory_hash(directory):
+    """Fingerprint of the workbooks under ``directory`` from their names, sizes and mtimes."""
+    digest = hashlib.sha256()
+    for path in discover(directory):
+        stat = os.stat(path)
+        digest.update(f"{os.path.relpath(path, directory)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def read_workbook(path, engine=None):
+    """The export-like sheets of one workbook, with reconciled column names."""
+    # Runs in a worker process for each workbook
+    frames = []
+    for sheet, frame in pd.read_excel(path, sheet_name=None, engine=engine).items():
+        frame.columns = [reconcile_column(col) for col in frame.columns]
+        if all(col in frame.columns for col in REQUIRED_COLUMNS):
+            frames.append(frame.dropna(how='all'))
+    return frames
+
+
+def read_workbooks(directory, workers=None):
+    """All workbooks under ``directory`` stacked into one raw frame.
+
+    The workbooks are parsed in ``workers`` processes (all cores by default).
+    """
+    paths = discover(directory)
+    if not paths:
+        raise FileNotFoundError(f"no Excel workbooks under {str(directory)!r}")
+    engine = excel_engine()
+    workers = min(workers or default_workers(), len(paths))
+    if workers == 1:
+        parts = [read_workbook(path, engine) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(read_workbook, paths, [engine] * len(paths)))
+    frames = [frame for part in parts for frame in part]
+    if not frames:
+        raise ValueError(f"no sheet under {str(directory)!r} has the columns {REQUIRED_COLUMNS}")
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,18 @@
+import pytest
+
+from hub_rental.ingest import clean_frame
+from hub_rental.synthetic import generate, write_csv
+
+
+@pytest.fixture(scope='session')
+def frame():
+    """A cleaned synthetic dataset of 5000 rows."""
+    return clean_frame(generate(5000, seed=1))
+
+
+@pytest.fixture(scope='session')
+def export_csv(tmp_path_factory):
+    """Path of a synthetic CSV export of 5000 rows."""
+    path = tmp_path_factory.mktemp('export') / 'export.csv'
+    write_csv(path, 5000, seed=1)
+    return path
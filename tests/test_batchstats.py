@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from hub_rental.batchstats import batch_compare, compare_segments
+from hub_rental.stages import RENTED_COLUMN
+
+COLUMN = 'Total Acres Serviced'
+
+
+def _groups(segment):
+    valid = segment[segment[COLUMN].notna()]
+    rented = valid.loc[valid[RENTED_COLUMN] == 'Yes', COLUMN].to_numpy(dtype='float64')
+    other = valid.loc[valid[RENTED_COLUMN] == 'No', COLUMN].to_numpy(dtype='float64')
+    return rented, other
+
+
+# Regions with a single rented row have no variance or interval for that group
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_segments_match_scipy(frame):
+    result = compare_segments(frame, 'Region of operation', confidence=0.9)
+    regions = frame.groupby('Region of operation', observed=True)
+    assert len(result) == regions.ngroups
+    for region, segment in regions:
+        row = result.loc[region]
+        rented, other = _groups(segment)
+        assert (row['n_rented'], row['n_non_rented']) == (len(rented), len(other))
+
+        student = stats.ttest_ind(rented, other)
+        welch = stats.ttest_ind(rented, other, equal_var=False)
+        mwu = stats.mannwhitneyu(rented, other, method='asymptotic')
+        low, high = stats.t.interval(0.9, len(rented) - 1, loc=rented.mean(), scale=stats.sem(rented))
+        d = (rented.mean() - other.mean()) / np.sqrt((rented.var(ddof=1) + other.var(ddof=1)) / 2)
+
+        expected = {
+            't_student': student.statistic, 'p_student': student.pvalue,
+            't_welch': welch.statistic, 'p_welch': welch.pvalue,
+            'u_stat': mwu.statistic, 'p_mannwhitney': mwu.pvalue,
+            'ci_rented_low': low, 'ci_rented_high': high,
+            'std_rented': rented.std(ddof=1), 'cohens_d': d,
+        }
+        for name, value in expected.items():
+            assert row[name] == pytest.approx(value, rel=1e-9, nan_ok=True), (region, name)
+
+
+def test_overall_dimension_is_the_whole_dataset(frame):
+    overall = batch_compare(frame, {'overall': None})
+    rented, other = _groups(frame)
+    assert overall['segment'].tolist() == ['all']
+    assert overall.loc[0, 'mean_diff'] == pytest.approx(rented.mean() - other.mean(), rel=1e-12)
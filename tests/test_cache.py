@@ -0,0 +1,75 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from hub_rental import cache
+from hub_rental.cache import load_dataset
+from hub_rental.profiling import Profiler
+
+
+@pytest.fixture
+def source(export_csv, tmp_path):
+    path = tmp_path / 'export.csv'
+    shutil.copy(export_csv, path)
+    return str(path)
+
+
+def _load(source, cache_dir):
+    profiler = Profiler()
+    df = load_dataset(source, str(cache_dir), profiler=profiler)
+    return df, [record['stage'] for record in profiler.records]
+
+
+def _rewrite(path, edit):
+    # Change the file's content, then give it back its old mtime
+    stat = os.stat(path)
+    with open(path) as fh:
+        text = fh.read()
+    with open(path, 'w') as fh:
+        fh.write(edit(text))
+    return stat
+
+
+def test_unchanged_file_is_read_from_the_cache(source, tmp_path):
+    first, stages = _load(source, tmp_path / 'cache')
+    assert 'parse' in stages
+    again, stages = _load(source, tmp_path / 'cache')
+    assert stages == ['hash', 'cache-read']
+    pd.testing.assert_frame_equal(again, first)
+
+
+def test_new_mtime_rehashes_but_same_content_is_not_reparsed(source, tmp_path):
+    _load(source, tmp_path / 'cache')
+    os.utime(source, ns=(0, 0))
+    _, stages = _load(source, tmp_path / 'cache')
+    assert stages == ['hash', 'cache-read']
+
+
+def test_changed_content_is_reparsed(source, tmp_path):
+    first, _ = _load(source, tmp_path / 'cache')
+    # Same size, new content: the mtime gives it away
+    stat = _rewrite(source, lambda text: text.replace('"No"', '"NO"', 1))
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    changed, stages = _load(source, tmp_path / 'cache')
+    assert 'parse' in stages and os.path.getsize(source) == stat.st_size
+    assert len(changed) == len(first) and not changed.equals(first)
+
+
+def test_changed_size_is_reparsed(source, tmp_path):
+    first, _ = _load(source, tmp_path / 'cache')
+    stat = _rewrite(source, lambda text: text + text.splitlines()[-1] + '\n')
+    # Keep the old mtime: the size alone invalidates the entry
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    changed, stages = _load(source, tmp_path / 'cache')
+    assert 'parse' in stages and len(changed) == len(first) + 1
+
+
+def test_clean_version_bump_reparses(source, tmp_path, monkeypatch):
+    _load(source, tmp_path / 'cache')
+    monkeypatch.setattr(cache, 'CLEAN_VERSION', cache.CLEAN_VERSION + 1)
+    _, stages = _load(source, tmp_path / 'cache')
+    assert 'parse' in stages
+    # The frame cached under the old version is replaced, not kept beside it
+    assert len([name for name in os.listdir(tmp_path / 'cache') if name.endswith('.feather')]) == 1
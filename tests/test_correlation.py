@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hub_rental.correlation import X_COLUMN, Y_COLUMN, CrossProducts, correlation_matrix, spearman
+
+REGION = 'Region of operation'
+
+
+def _fit(segment):
+    pairs = segment[[X_COLUMN, Y_COLUMN]].dropna().astype('float64')
+    x, y = pairs[X_COLUMN].to_numpy(), pairs[Y_COLUMN].to_numpy()
+    slope, intercept = np.polyfit(x, y, 1)
+    residual = y - (slope * x + intercept)
+    return {
+        'n': len(pairs),
+        'pearson': pairs[X_COLUMN].corr(pairs[Y_COLUMN]),
+        'slope': slope,
+        'intercept': intercept,
+        'r_squared': 1 - (residual ** 2).sum() / ((y - y.mean()) ** 2).sum(),
+    }
+
+
+def _assert_fit(row, expected):
+    for name, value in expected.items():
+        assert row[name] == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+def test_overall_fit_matches_polyfit_and_pandas(frame):
+    fit = CrossProducts([X_COLUMN, Y_COLUMN]).update(frame).ols().iloc[0]
+    _assert_fit(fit, _fit(frame))
+    assert spearman(frame).iloc[0] == pytest.approx(
+        frame[X_COLUMN].astype('float64').corr(frame[Y_COLUMN], method='spearman'), rel=1e-12)
+
+
+def test_segment_fits_match_polyfit_and_pandas(frame):
+    fits = CrossProducts([X_COLUMN, Y_COLUMN], by=REGION).update(frame).ols()
+    ranks = spearman(frame, by=REGION)
+    for region, segment in frame.groupby(REGION, observed=True):
+        _assert_fit(fits.loc[region], _fit(segment))
+        expected = segment[X_COLUMN].astype('float64').corr(segment[Y_COLUMN], method='spearman')
+        assert ranks.loc[region] == pytest.approx(expected, rel=1e-9, nan_ok=True), region
+
+
+def test_updates_in_parts_match_one_update(frame):
+    whole = CrossProducts([X_COLUMN, Y_COLUMN], by=REGION).update(frame).ols()
+    parts = CrossProducts([X_COLUMN, Y_COLUMN], by=REGION)
+    for start in range(0, len(frame), 1500):
+        parts.update(frame.iloc[start:start + 1500])
+    pd.testing.assert_frame_equal(parts.ols().sort_index(), whole.sort_index(), rtol=1e-9)
+
+
+def test_zero_variance_segment_has_no_fit():
+    df = pd.DataFrame({
+        X_COLUMN: [1.0, 2.0, 3.0, 4.0, 3.0, 3.0, 3.0],
+        Y_COLUMN: [10.0, 21.0, 29.0, 41.0, 5.0, 7.0, 9.0],
+        REGION: ['a', 'a', 'a', 'a', 'flat', 'flat', 'flat'],
+    })
+    fits = CrossProducts([X_COLUMN, Y_COLUMN], by=REGION).update(df).ols()
+    _assert_fit(fits.loc['a'], _fit(df[df[REGION] == 'a']))
+    assert fits.loc['flat', ['pearson', 'slope', 'intercept', 'r_squared']].isna().all()
+    assert np.isnan(spearman(df, by=REGION).loc['flat'])
+
+
+def test_correlation_matrix_matches_pandas(frame):
+    numeric = frame.select_dtypes(include='number').drop(columns='Year').astype('float64')
+    numeric['Constant'] = 2.0
+    result = correlation_matrix(numeric)
+    assert 'Year' not in correlation_matrix(frame).columns
+    pd.testing.assert_frame_equal(result, numeric.corr(), rtol=1e-9, atol=1e-12)
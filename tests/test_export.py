@@ -0,0 +1,38 @@
+import os
+
+import pandas as pd
+import pytest
+
+from hub_rental.export import DEFAULT_PARTITIONS, export_dataset, infer_format, read_export
+from hub_rental.ingest import clean_frame, read_source
+
+
+@pytest.fixture(scope='module')
+def loaded(export_csv):
+    return clean_frame(read_source(export_csv))
+
+
+@pytest.mark.parametrize('name', ['export.csv', 'export.csv.gz', 'export.arrow', 'export.feather'])
+def test_file_formats_round_trip(loaded, tmp_path, name):
+    path = export_dataset(loaded, tmp_path / name)
+    back = read_export(path) if infer_format(path) == 'arrow' else clean_frame(read_source(path))
+    pd.testing.assert_frame_equal(back, loaded)
+    assert os.listdir(tmp_path) == [name]
+
+
+def test_partitioned_parquet_round_trips(loaded, tmp_path):
+    path = export_dataset(loaded, tmp_path / 'export.parquet')
+    assert sorted(os.listdir(path)) == sorted(f"Year={year}" for year in loaded['Year'].unique())
+    back = read_export(path)
+    # Partition columns come back last, as categoricals, and the rows grouped
+    # by partition
+    assert list(back.columns[-2:]) == list(DEFAULT_PARTITIONS)
+    back = back[loaded.columns].sort_values('ID').reset_index(drop=True)
+    for column in DEFAULT_PARTITIONS:
+        back[column] = back[column].astype(loaded[column].dtype)
+    pd.testing.assert_frame_equal(back, loaded.sort_values('ID').reset_index(drop=True))
+
+
+def test_unknown_suffix_is_rejected(loaded, tmp_path):
+    with pytest.raises(ValueError, match='cannot infer the export format'):
+        export_dataset(loaded, tmp_path / 'export.xlsx')
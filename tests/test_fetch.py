@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import http.client
+import http.server
+import threading
+import urllib.error
+
+import pandas as pd
+import pytest
+
+from hub_rental.cache import load_dataset
+from hub_rental.fetch import fetch_all, fetch_all_async
+from hub_rental.ingest import read_source, source_opener
+
+ETAG = '"v1"'
+
+
+class SheetHandler(http.server.BaseHTTPRequestHandler):
+    # Stand-in for the sheet export: answers conditional requests with 304,
+    # fails the next ``state['failures']`` requests and every request while
+    # ``state['offline']``, with a 503 asking for an immediate retry
+    state = {}
+
+    def do_GET(self):
+        state = self.state
+        state['requests'] += 1
+        if self.path == '/truncated.csv':
+            # Promises the whole export, sends its first bytes and hangs up
+            self.send_response(200)
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', str(len(state['body'])))
+            self.end_headers()
+            self.wfile.write(state['body'][:14])
+            return
+        if self.path == '/cut.csv':
+            # A chunked response cut off inside its first chunk
+            self.wfile.write(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n100\r\n'
+                             + state['body'][:14])
+            self.close_connection = True
+            return
+        if state['offline'] or state['failures'] > 0:
+            state['failures'] -= 1
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(state['body'])))
+        self.end_headers()
+        self.wfile.write(state['body'])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sheet(export_csv):
+    with open(export_csv, 'rb') as fh:
+        SheetHandler.state = {'body': fh.read(), 'requests': 0, 'failures': 0, 'offline': False}
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), SheetHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/export.csv", SheetHandler.state
+    server.shutdown()
+    server.server_close()
+
+
+def test_conditional_get(sheet):
+    url, state = sheet
+    result = fetch_all([url])[url]
+    assert result['status'] == 'fetched' and result['etag'] == ETAG
+    assert result['body'].read() == state['body']
+    assert result['digest'] == hashlib.sha256(state['body']).hexdigest()
+
+    again = fetch_all([url], {url: {'etag': result['etag']}})[url]
+    assert again['status'] == 'not-modified' and 'body' not in again
+
+
+def test_retries_server_errors(sheet):
+    url, state = sheet
+    state['failures'] = 2
+    assert fetch_all([url], retries=3)[url]['status'] == 'fetched'
+    assert state['requests'] == 3
+
+    state['failures'] = 2
+    result = fetch_all([url], retries=1)[url]
+    assert result['status'] == 'failed' and result['error'].code == 503
+
+
+def test_offline_falls_back_to_the_cached_copy(sheet, tmp_path):
+    url, state = sheet
+    online = load_dataset(url, str(tmp_path))
+    state['offline'] = True
+    pd.testing.assert_frame_equal(load_dataset(url, str(tmp_path)), online)
+    with pytest.raises(urllib.error.HTTPError):
+        load_dataset(url, str(tmp_path / 'empty'))
+
+
+def test_fetch_inside_a_running_event_loop(sheet):
+    url, _ = sheet
+
+    async def notebook_cell():
+        blocking = fetch_all([url])[url]
+        awaited = (await fetch_all_async([url]))[url]
+        return blocking['digest'], awaited['digest']
+
+    blocking, awaited = asyncio.run(notebook_cell())
+    assert blocking == awaited
+
+
+def test_remote_source_is_read_from_the_spooled_body(sheet, export_csv):
+    url, _ = sheet
+    assert not isinstance(source_opener(url)(), (bytes, str))
+    pd.testing.assert_frame_equal(read_source(url), read_source(export_csv))
+
+
+def test_truncated_body_is_retried_then_fails(sheet):
+    url, state = sheet
+    truncated = url.replace('export.csv', 'truncated.csv')
+    result = fetch_all([truncated], retries=1, backoff=0)[truncated]
+    assert result['status'] == 'failed' and state['requests'] == 2
+    assert isinstance(result['error'], http.client.IncompleteRead)
+
+
+def test_broken_response_fails_only_its_own_url(sheet):
+    url, _ = sheet
+    cut = url.replace('export.csv', 'cut.csv')
+    results = fetch_all([url, cut], retries=1, backoff=0)
+    assert results[url]['status'] == 'fetched'
+    assert results[cut]['status'] == 'failed'
+    assert isinstance(results[cut]['error'], http.client.HTTPException)
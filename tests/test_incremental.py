@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from hub_rental.incremental import IncrementalAggregate
+from hub_rental.parallel import BREAKDOWNS
+
+
+def _folded(*extracts):
+    state = IncrementalAggregate()
+    added = [state.update(extract) for extract in extracts]
+    return state, added
+
+
+def test_appended_rows_match_a_full_recompute(frame):
+    full, _ = _folded(frame)
+    state, added = _folded(frame.iloc[:4000], frame)
+    assert sum(added) == len(full.seen)
+    assert np.array_equal(state.seen, full.seen)
+    for name in BREAKDOWNS:
+        pd.testing.assert_frame_equal(state.group_stats(name), full.group_stats(name), check_dtype=False)
+
+
+def test_seen_hashes_stay_sorted_and_unique(frame):
+    state, _ = _folded(frame.iloc[:2000], frame.iloc[1000:3000], frame)
+    assert (state.seen[1:] > state.seen[:-1]).all()
+    assert not len(state.new_rows(frame))
+
+
+def test_unchanged_extract_and_repeated_rows_add_nothing(frame):
+    state, added = _folded(frame, frame)
+    assert added[1] == 0
+    assert state.update(pd.concat([frame.iloc[:100], frame.iloc[:100]])) == 0
@@ -0,0 +1,54 @@
+import concurrent.futures
+import threading
+
+import pandas as pd
+
+from hub_rental import stages
+from hub_rental.cache import dataset_hash, load_dataset
+from hub_rental.memo import AGGREGATES, AggregateCache
+
+
+def test_cached_aggregate_matches_stage(frame):
+    cached = AggregateCache().bind(frame).get('aggregate')
+    direct = stages.aggregate(frame)
+    assert list(cached) == list(direct)
+    pd.testing.assert_frame_equal(cached['summary'], direct['summary'])
+    for name in ('missing_data', 'acres_by_year', 'implement_performance'):
+        pd.testing.assert_series_equal(cached[name], direct[name])
+
+
+def test_source_digest_identifies_the_frame(export_csv, tmp_path):
+    cache_dir = str(tmp_path)
+    assert dataset_hash([export_csv], cache_dir) is None
+    df = load_dataset(export_csv, cache_dir)
+    digest = dataset_hash([export_csv], cache_dir)
+
+    memo = AggregateCache(cache_dir=str(tmp_path / 'memo'))
+    first = memo.bind(df, digest).get('acres_by_year')
+    # A later process reloading the unchanged source gets the persisted result
+    again = AggregateCache(cache_dir=str(tmp_path / 'memo'))
+    pd.testing.assert_series_equal(again.bind(load_dataset(export_csv, cache_dir), digest).get('acres_by_year'), first)
+    assert (again.hits, again.misses) == (1, 0)
+
+
+def test_hits_do_not_wait_for_a_miss_being_computed(frame, monkeypatch):
+    started, release, calls = threading.Event(), threading.Event(), []
+
+    def blocked(df):
+        calls.append(1)
+        started.set()
+        release.wait(10)
+        return len(df)
+
+    monkeypatch.setitem(AGGREGATES, 'blocked', blocked)
+    cache = AggregateCache()
+    cache.get('acres_by_year', frame, frame_hash='frame')
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        misses = [pool.submit(cache.get, 'blocked', frame, frame_hash='frame') for _ in range(2)]
+        assert started.wait(10)
+        # Answered while the miss is still computing
+        cache.get('acres_by_year', frame, frame_hash='frame')
+        assert not any(miss.done() for miss in misses)
+        release.set()
+        assert [miss.result() for miss in misses] == [len(frame)] * 2
+    assert len(calls) == 1 and cache.misses == 2
@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from hub_rental import stages
+from hub_rental.parallel import BREAKDOWNS, breakdowns, can_fork
+
+
+@pytest.mark.skipif(not can_fork(), reason='the parallel breakdowns need fork')
+def test_parallel_breakdowns_equal_serial_groupby_exactly(frame):
+    results = breakdowns(frame, workers=3, min_rows=0)
+    assert list(results) == list(BREAKDOWNS)
+    for name, (by, how) in BREAKDOWNS.items():
+        grouped = frame.groupby(by if len(by) > 1 else by[0], observed=True)['Total Acres Serviced']
+        pd.testing.assert_series_equal(results[name], getattr(grouped, how)(), check_exact=True)
+
+
+def test_serial_breakdowns_below_threshold(frame):
+    serial = breakdowns(frame, workers=1)
+    small = breakdowns(frame, workers=4)
+    for name in BREAKDOWNS:
+        pd.testing.assert_series_equal(serial[name], small[name], check_exact=True)
+
+
+def test_report_tables_are_the_shared_breakdowns(frame):
+    aggregates = stages.aggregate(frame)
+    results = breakdowns(frame, workers=1)
+    for name in ('acres_by_year', 'implement_performance'):
+        pd.testing.assert_series_equal(aggregates[name], results[name], check_exact=True)
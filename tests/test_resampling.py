@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from hub_rental.resampling import BLOCK_ELEMENTS, resample_report
+from hub_rental.stages import rental_split
+
+RESAMPLES = 2_000
+
+
+@pytest.fixture(scope='module')
+def serial(frame):
+    return resample_report(frame, n_resamples=RESAMPLES, seed=3, workers=1)
+
+
+def test_same_seed_same_result_for_any_worker_count(frame, serial):
+    # Several blocks, so the workers really split the resamples
+    assert RESAMPLES > BLOCK_ELEMENTS // len(frame)
+    pd.testing.assert_frame_equal(resample_report(frame, n_resamples=RESAMPLES, seed=3, workers=3), serial,
+                                  check_exact=True)
+
+
+def test_seed_changes_resamples_not_estimates(frame, serial):
+    other = resample_report(frame, n_resamples=RESAMPLES, seed=4, workers=1)
+    pd.testing.assert_series_equal(other['estimate'], serial['estimate'])
+    assert not other['ci_low'].equals(serial['ci_low'])
+
+    rented, non_rented = rental_split(frame, 'Total Acres Serviced')
+    mean_diff = serial.loc['mean_diff']
+    assert mean_diff['estimate'] == pytest.approx(rented.mean() - non_rented.mean(), rel=1e-12)
+    assert mean_diff['ci_low'] < mean_diff['estimate'] < mean_diff['ci_high']
+    assert (serial['resamples'] == RESAMPLES).all()
+    assert serial['p_permutation'].between(1 / (RESAMPLES + 1), 1).all()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hub_rental.rollups import DATE_COLUMN, DIMENSIONS, MEASURES, Rollups
+
+
+@pytest.fixture(scope='module')
+def rollups(frame):
+    return Rollups(frame)
+
+
+def _direct(frame, start, end, by=()):
+    dates = frame[DATE_COLUMN]
+    rows = frame[(dates >= start) & (dates < end + pd.Timedelta(days=1))]
+    measures = pd.DataFrame({name: derive(rows).astype('float64') for name, derive in MEASURES.items()})
+    if not by:
+        return measures.sum()
+    keys = [rows[DIMENSIONS[name]].astype(str).rename(name) for name in by]
+    return measures.groupby(keys).sum()
+
+
+def test_random_ranges_match_a_filtered_groupby(frame, rollups):
+    rng = np.random.default_rng(0)
+    days = pd.date_range(frame[DATE_COLUMN].min().floor('D'), frame[DATE_COLUMN].max(), freq='D')
+    for _ in range(20):
+        start, end = sorted(rng.choice(days, 2))
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        pd.testing.assert_series_equal(rollups.query(start, end), _direct(frame, start, end), check_names=False)
+        by_region = rollups.query(start, end, by='region')
+        expected = _direct(frame, start, end, by=['region'])
+        pd.testing.assert_frame_equal(by_region.loc[expected.index], expected,
+                                      check_names=False, check_index_type=False)
+        assert (by_region.drop(expected.index) == 0).all(axis=None)
+
+
+def test_coarse_grain_answers_aligned_ranges(frame, rollups):
+    start, end = pd.Timestamp('2023-02-01'), pd.Timestamp('2023-04-30')
+    assert rollups.cube_for(start, end).grain == 'monthly'
+    monthly = rollups.query(start, end, grain='monthly', region=['Kisumu'])
+    daily = rollups.query(start, end, grain='daily', region=['Kisumu'])
+    pd.testing.assert_series_equal(monthly, daily)
+
+
+def test_misaligned_range_with_explicit_grain_is_rejected(rollups):
+    with pytest.raises(ValueError, match='does not begin a monthly period'):
+        rollups.query('2023-02-10', '2023-04-30', grain='monthly')
+    with pytest.raises(ValueError, match='does not finish a weekly period'):
+        rollups.query('2023-02-06', '2023-02-08', grain='weekly')
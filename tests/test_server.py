@@ -0,0 +1,49 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from hub_rental import stages
+from hub_rental.server import ReportService, Snapshot
+
+
+@pytest.fixture
+def service(export_csv, tmp_path):
+    source = str(tmp_path / 'export.csv')
+    shutil.copy(export_csv, source)
+    service = ReportService([source], cache_dir=str(tmp_path / 'cache'), refresh_interval=0)
+    service.start()
+    return service
+
+
+def test_unchanged_sources_are_not_reloaded(service):
+    snapshot = service.snapshot
+    assert service.reload() is False
+    assert service.snapshot is snapshot
+
+    # A touched but identical file is re-hashed, still nothing is reloaded
+    os.utime(service.sources[0], ns=(0, 0))
+    assert service.reload() is False and service.snapshot is snapshot
+
+    with open(service.sources[0]) as fh:
+        last = fh.read().splitlines()[-1]
+    with open(service.sources[0], 'a') as fh:
+        fh.write(last + '\n')
+    assert service.reload() is True
+    assert len(service.snapshot.df) == len(snapshot.df) + 1
+    assert service.snapshot.frame_hash != snapshot.frame_hash
+
+
+def test_cached_filtered_query_does_not_select_rows(service, monkeypatch):
+    filters = {'Region of operation': ('Kisumu', 'Siaya')}
+    first = service.query('acres-by-year', filters)
+    expected = stages.acres_by_year(service.snapshot.df[service.snapshot.df['Region of operation'].isin(
+        ['Kisumu', 'Siaya'])])
+    pd.testing.assert_series_equal(first, expected)
+
+    def select(self, filters):
+        raise AssertionError('rows selected for a cached answer')
+
+    monkeypatch.setattr(Snapshot, 'select', select)
+    assert service.query('acres-by-year', filters) is first
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hub_rental.sketches import DurationSketch, Moments, QuantileSketch
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+@pytest.fixture(scope='module')
+def values():
+    return np.random.default_rng(7).lognormal(mean=2.0, sigma=0.8, size=200_000)
+
+
+def _rank_errors(sketch, values):
+    ordered = np.sort(values)
+    estimates = sketch.quantile(QUANTILES)
+    ranks = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return np.abs(ranks - QUANTILES)
+
+
+def _total_weight(sketch):
+    return sum(len(level) * 2 ** h for h, level in enumerate(sketch.levels))
+
+
+def test_rank_error_within_documented_bound(values):
+    sketch = QuantileSketch(seed=1).update(values)
+    assert len(sketch.levels) > 1
+    assert _total_weight(sketch) == sketch.n == len(values)
+    assert _rank_errors(sketch, values).max() <= sketch.rank_error
+
+
+def test_merged_sketch_is_a_sketch_of_the_union(values):
+    parts = [QuantileSketch(seed=seed).update(chunk) for seed, chunk in enumerate(np.array_split(values, 5))]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.n == len(values) and _total_weight(merged) == len(values)
+    assert _rank_errors(merged, values).max() <= merged.rank_error
+
+
+def test_merged_moments_match_pandas(values):
+    data = np.concatenate([values[:1000], values[1000:] * 3 + 50])
+    merged = Moments.from_values(data[:1000]).merge(Moments.from_values(data[1000:]))
+    whole = Moments.from_values(data)
+    series = pd.Series(data)
+    for moments in (merged, whole):
+        assert moments.n == len(data)
+        assert moments.mean == pytest.approx(series.mean(), rel=1e-12)
+        assert moments.std() == pytest.approx(series.std(), rel=1e-10)
+        assert moments.skew() == pytest.approx(series.skew(), rel=1e-9)
+        assert moments.kurtosis() == pytest.approx(series.kurt(), rel=1e-9)
+    for name in ('m2', 'm3', 'm4'):
+        assert getattr(merged, name) == pytest.approx(getattr(whole, name), rel=1e-9)
+
+
+def test_empty_and_single_value_sketches():
+    empty = QuantileSketch().update([np.nan])
+    assert empty.n == 0 and np.isnan(empty.quantile(0.5))
+    assert np.isnan(empty.quantile([0.25, 0.75])).all()
+
+    single = DurationSketch.from_values([4.0, np.nan])
+    assert single.quantiles.quantile(0.5) == 4.0
+    assert (single.min, single.max, single.moments.mean) == (4.0, 4.0, 4.0)
+    assert np.isnan(single.moments.std()) and np.isnan(single.moments.skew())
+
+    # Merging with an empty sketch changes nothing, either way round
+    merged = DurationSketch.from_values([]).merge(single)
+    pd.testing.assert_series_equal(merged.describe(), single.describe())
+    pd.testing.assert_series_equal(single.merge(DurationSketch()).describe(), merged.describe())
+    assert DurationSketch().describe().drop('count').isna().all()
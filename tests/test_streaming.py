@@ -0,0 +1,42 @@
+import csv
+
+import pandas as pd
+
+from hub_rental import stages
+from hub_rental.ingest import clean_frame, read_source
+from hub_rental.schema import reconcile_column
+from hub_rental.streaming import iter_chunks, streaming_aggregate
+
+
+def _corrupt(source, target, row, column, value):
+    with open(source, newline='') as fh:
+        rows = list(csv.reader(fh))
+    header = [reconcile_column(name) for name in rows[0]]
+    rows[row][header.index(column)] = value
+    with open(target, 'w', newline='') as fh:
+        csv.writer(fh).writerows(rows)
+
+
+def test_streaming_matches_in_memory_aggregate(export_csv):
+    streamed = streaming_aggregate(export_csv, chunksize=700)
+    expected = stages.aggregate(clean_frame(read_source(export_csv)))
+    pd.testing.assert_series_equal(streamed['acres_by_year'], expected['acres_by_year'], check_names=False)
+    pd.testing.assert_series_equal(streamed['implement_performance'], expected['implement_performance'], check_names=False)
+    pd.testing.assert_series_equal(streamed['missing_data'], expected['missing_data'])
+    assert streamed['overview']['records'] == 5000
+
+
+def test_unparsable_cell_restarts_untyped_without_repeating_rows(export_csv, tmp_path):
+    path = tmp_path / 'corrupt.csv'
+    _corrupt(export_csv, path, 3500, 'Days rented', 'n/k')
+
+    chunks = list(iter_chunks(path, chunksize=1000))
+    ids = pd.concat([chunk['ID'] for chunk in chunks])
+    assert [len(chunk) for chunk in chunks] == [1000] * 5
+    assert ids.is_unique and len(ids) == 5000
+    assert pd.isna(chunks[3].loc[chunks[3]['ID'] == ids.iloc[3499], 'Days rented']).all()
+
+    streamed = streaming_aggregate(path, chunksize=1000)
+    expected = stages.aggregate(clean_frame(read_source(path)))
+    pd.testing.assert_series_equal(streamed['acres_by_year'], expected['acres_by_year'], check_names=False)
+    pd.testing.assert_series_equal(streamed['missing_data'], expected['missing_data'])
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from hub_rental.ingest import clean_frame, read_source
+from hub_rental.synthetic import generate
+from hub_rental.workbooks import read_workbooks
+
+
+def _drift(name):
+    # Headers as retyped by another hub: upper case, padded, breaks as spaces
+    return f"  {name.replace(chr(10), ' ').upper()} "
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return generate(600, seed=4)
+
+
+@pytest.fixture(scope='module')
+def backfill(raw, tmp_path_factory):
+    directory = tmp_path_factory.mktemp('workbooks')
+    (directory / 'hubs').mkdir()
+    raw.iloc[:300].to_excel(directory / '2023.xlsx', index=False)
+    with pd.ExcelWriter(directory / 'hubs' / 'kisumu.xlsx') as writer:
+        raw.iloc[300:].rename(columns=_drift).to_excel(writer, sheet_name='Data', index=False)
+        pd.DataFrame({'Notes': ['exported by hand']}).to_excel(writer, sheet_name='Notes', index=False)
+    # An Excel lock file next to an open workbook
+    (directory / '~$2023.xlsx').write_bytes(b'')
+    return directory
+
+
+def test_drifted_headers_are_reconciled_into_one_frame(raw, backfill, tmp_path):
+    stacked = read_workbooks(backfill, workers=1)
+    assert len(stacked) == len(raw)
+    assert 'Notes' not in stacked.columns
+
+    csv = tmp_path / 'export.csv'
+    raw.to_csv(csv, index=False)
+    expected = clean_frame(read_source(csv))
+    pd.testing.assert_frame_equal(clean_frame(stacked), expected)
+
+
+def test_directory_source_is_read_as_its_workbooks(backfill):
+    pd.testing.assert_frame_equal(clean_frame(read_source(backfill)), clean_frame(read_workbooks(backfill, workers=1)))